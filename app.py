@@ -2,16 +2,27 @@
 VisionLab Pro - Main Application (SESSION STATE FIXED)
 """
 
+import importlib
+from functools import partial
 import streamlit as st
-import cv2
-import numpy as np
 from config import *
-from utils.image_utils import load_image, save_image, get_image_info
+from utils.image_utils import load_image, save_image, display_image, get_image_info, upload_key
 from utils.metrics import calculate_all_metrics, get_quality_label
+from utils.session import (new_history, get_proxy, start_proxy, stop_proxy, undo, reset_image,
+                           display_original)
 
 # Page config
 st.set_page_config(page_title=PAGE_TITLE, page_icon=PAGE_ICON, layout=LAYOUT)
 
+@st.cache_resource
+def warm_models():
+    """Load the rembg model once per server process (in the background)"""
+    from ops.background import warmup_session
+    return warmup_session()
+
+if REMBG_WARMUP:
+    warm_models()
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -37,11 +48,13 @@ if 'original_image' not in st.session_state:
 if 'processed_image' not in st.session_state:
     st.session_state.processed_image = None
 if 'history' not in st.session_state:
-    st.session_state.history = []
+    st.session_state.history = new_history()
 if 'current_module' not in st.session_state:
     st.session_state.current_module = "Auto Enhancer"
 if 'current_file_id' not in st.session_state:
     st.session_state.current_file_id = None
+if 'proxy' not in st.session_state:
+    st.session_state.proxy = None
 
 # Header
 st.markdown(f'<div class="main-header">🎨 {APP_NAME}</div>', unsafe_allow_html=True)
@@ -54,16 +67,19 @@ with st.sidebar:
     
     # Only load image if it's a NEW upload
     if uploaded_file is not None:
-        file_id = f"{uploaded_file.name}_{uploaded_file.size}"
+        file_id = upload_key(uploaded_file)
         
-        # Check if this is a new file
+        # Check if this is new content (re-uploading the same bytes keeps the session)
         if st.session_state.current_file_id != file_id:
             image = load_image(uploaded_file)
             if image is not None:
                 st.session_state.original_image = image
-                st.session_state.processed_image = image.copy()
-                st.session_state.history = []
                 st.session_state.current_file_id = file_id
+                if st.session_state.get('proxy_mode'):
+                    start_proxy(image)
+                else:
+                    st.session_state.processed_image = image.copy()
+                    st.session_state.history = new_history()
                 st.success("✅ Image loaded!")
         
         # Show info if image exists
@@ -91,30 +107,79 @@ with st.sidebar:
     with col1:
         if st.button("🔄 Reset", use_container_width=True):
             if st.session_state.original_image is not None:
-                st.session_state.processed_image = st.session_state.original_image.copy()
+                reset_image()
                 st.rerun()
     
     with col2:
         if st.button("↩️ Undo", use_container_width=True):
-            if len(st.session_state.history) > 0:
-                st.session_state.processed_image = st.session_state.history.pop()
+            if undo():
+                st.rerun()
+    
+    proxy_mode = st.checkbox("⚡ Proxy Editing", key="proxy_mode",
+                             help="Edit a display-sized copy for instant feedback; the edits are "
+                                  "replayed at full resolution on render. Undo history restarts "
+                                  "when switching modes.")
+    if st.session_state.processed_image is not None:
+        if proxy_mode and get_proxy() is None:
+            start_proxy(st.session_state.processed_image)
+            st.rerun()
+        elif not proxy_mode and get_proxy() is not None:
+            if get_proxy().replayable:
+                with st.spinner("Rendering full resolution..."):
+                    stop_proxy()
                 st.rerun()
+            st.warning("Background swaps can't be replayed at full resolution.")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("🗑️ Discard Proxy Edits", use_container_width=True, key="proxy_discard"):
+                    stop_proxy('discard')
+                    st.rerun()
+            with col2:
+                if st.button("📐 Keep Proxy Result", use_container_width=True, key="proxy_keep",
+                             help="Keeps the edits at proxy resolution, scaled up to full size"):
+                    stop_proxy('keep')
+                    st.rerun()
     
     if st.session_state.processed_image is not None:
         st.markdown("---")
         st.header("💾 Download")
         
-        col1, col2 = st.columns(2)
+        output_image = st.session_state.processed_image
+        proxy = get_proxy()
+        if proxy is not None:
+            h, w = proxy.full_image.shape[:2]
+            st.caption(f"Editing a {proxy.factor:.0%} proxy of {w} × {h}")
+            if not proxy.replayable:
+                st.warning("Some edits can't be replayed at full resolution (background swaps). "
+                           "Turn off proxy editing to discard them or keep the proxy-resolution result.")
+                output_image = None
+            elif proxy.is_rendered():
+                output_image = proxy.render()
+            else:
+                output_image = None
+                if st.button("🖼️ Render Full Resolution", use_container_width=True, key="render_full"):
+                    with st.spinner("Rendering full resolution..."):
+                        proxy.render()
+                    st.rerun()
         
-        with col1:
-            png_data = save_image(st.session_state.processed_image, 'PNG')
-            if png_data:
-                st.download_button("PNG", png_data, "output.png", "image/png", use_container_width=True)
-        
-        with col2:
-            jpg_data = save_image(st.session_state.processed_image, 'JPEG')
-            if jpg_data:
-                st.download_button("JPEG", jpg_data, "output.jpg", "image/jpeg", use_container_width=True)
+        if output_image is not None:
+            with st.expander("⚙️ Encoder Settings"):
+                png_compression = st.slider("PNG Compression", 0, 9, PNG_COMPRESSION, key="png_compression",
+                                            help="Higher is smaller but slower to encode")
+                jpeg_quality = st.slider("JPEG Quality", 1, 100, JPEG_QUALITY, key="jpeg_quality")
+                progressive = st.checkbox("Progressive JPEG", value=False, key="jpeg_progressive")
+            
+            # Encoding happens on click (in a background thread) and is memoized per version
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.download_button("PNG", partial(save_image, output_image, 'PNG', png_compression=png_compression),
+                                   "output.png", "image/png", on_click="ignore", use_container_width=True)
+            
+            with col2:
+                st.download_button("JPEG", partial(save_image, output_image, 'JPEG', jpeg_quality=jpeg_quality,
+                                                   progressive=progressive),
+                                   "output.jpg", "image/jpeg", on_click="ignore", use_container_width=True)
 
 # Main content
 if st.session_state.original_image is None:
@@ -152,89 +217,26 @@ else:
     
     with col1:
         st.subheader("Original")
-        if len(st.session_state.original_image.shape) == 3:
-            original_display = cv2.cvtColor(st.session_state.original_image, cv2.COLOR_BGR2RGB)
-        else:
-            original_display = st.session_state.original_image
-        st.image(original_display, use_container_width=True)
+        display_image(display_original())
     
     with col2:
         st.subheader("Processed")
-        if len(st.session_state.processed_image.shape) == 3:
-            processed_display = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2RGB)
-        else:
-            processed_display = st.session_state.processed_image
-        st.image(processed_display, use_container_width=True)
+        display_image(st.session_state.processed_image)
     
     st.markdown("---")
     
     # Module routing
-    if current_module == "Test Simple":
-        from modules.test_simple import render_test_simple
-        render_test_simple()
-    
-    elif current_module == "Auto Enhancer":
-        from modules.auto_enhancer import render_auto_enhancer
-        render_auto_enhancer()
-    
-    elif current_module == "Image Upscaler":
-        from modules.upscaler import render_upscaler
-        render_upscaler()
-    
-    elif current_module == "Background Removal":
-        from modules.background_removal import render_background_removal
-        render_background_removal()
-    
-    elif current_module == "Low-Light Enhancer":
-        from modules.low_light import render_low_light
-        render_low_light()
-    
-    elif current_module == "Image Denoiser":
-        from modules.denoiser import render_denoiser
-        render_denoiser()
-    
-    elif current_module == "Color Enhancement":
-        from modules.color_enhancement import render_color_enhancement
-        render_color_enhancement()
-    
-    elif current_module == "Filter Gallery":
-        from modules.filters import render_filters
-        render_filters()
-    
-    elif current_module == "Edge Detection":
-        from modules.edge_detection import render_edge_detection
-        render_edge_detection()
-    
-    elif current_module == "Morphological Operations":
-        from modules.morphology import render_morphology
-        render_morphology()
-    
-    elif current_module == "Image Segmentation":
-        from modules.segmentation import render_segmentation
-        render_segmentation()
-    
-    elif current_module == "Frequency Domain":
-        from modules.frequency import render_frequency
-        render_frequency()
-    
-    elif current_module == "Histogram Analyzer":
-        from modules.histogram import render_histogram
-        render_histogram()
-    
-    elif current_module == "Image Compression":
-        from modules.compression import render_compression
-        render_compression()
-    
-    elif current_module == "Batch Processing":
-        from modules.batch_processing import render_batch_processing
-        render_batch_processing()
+    if current_module in MODULE_RENDERERS:
+        module_path, render_name = MODULE_RENDERERS[current_module]
+        render_module = getattr(importlib.import_module(module_path), render_name)
+        render_module()
     
     # Quality metrics
     st.markdown("---")
     st.subheader("📊 Quality Metrics")
     
     try:
-        metrics = calculate_all_metrics(st.session_state.original_image, st.session_state.processed_image)
+        metrics = calculate_all_metrics(display_original(), st.session_state.processed_image)
         
         col1, col2, col3 = st.columns(3)
         
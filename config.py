@@ -2,6 +2,7 @@
 VisionLab Pro - Configuration
 """
 
+import os
 import cv2
 
 # Application Info
@@ -17,6 +18,65 @@ LAYOUT = "wide"
 # File Upload Settings
 ALLOWED_EXTENSIONS = ['png', 'jpg', 'jpeg', 'bmp', 'tiff', 'webp']
 MAX_FILE_SIZE = 200 * 1024 * 1024
+DECODE_CACHE_SIZE = 6  # decoded arrays kept per process, keyed by content hash
+
+# Download Encoding
+ENCODE_CACHE_SIZE = 8  # encoded temp files kept, per image version and settings
+PNG_COMPRESSION = 6  # 0 (fastest) - 9 (smallest)
+JPEG_QUALITY = 75
+
+# Undo History
+HISTORY_BUDGET_MB = 256  # per session, checkpoints only
+HISTORY_CHECKPOINT_INTERVAL = 5  # full-resolution checkpoint every N steps
+
+# Proxy Editing
+PROXY_MAX_SIDE = 1600  # longest side of the working copy
+
+# Display Previews
+PREVIEW_MAX_SIDE = 1200  # longest side sent to the browser
+PREVIEW_FORMAT = 'JPEG'  # 'JPEG' or 'WEBP'
+PREVIEW_QUALITY = 85
+
+# Live Previews (slider changes rendered on a thumbnail, never committed)
+LIVE_PREVIEW_BUDGET_MS = 50  # target render time; the thumbnail size adapts to it
+LIVE_PREVIEW_DEBOUNCE_MS = 30  # quiet period before a render starts
+LIVE_PREVIEW_MIN_SIDE = 160
+LIVE_PREVIEW_MAX_SIDE = 640
+LIVE_PREVIEW_TIMEOUT = 1.0  # seconds a rerun waits before showing the previous preview
+
+# Tiled Processing
+TILE_SIZE = 1024  # pixels per tile side (before halo)
+TILE_WORKERS = os.cpu_count() or 1
+NLM_TILE_SIZE = 384  # smaller tiles for Non-Local Means: finer progress and faster cancellation
+
+# Derived Planes (gray/HSV/LAB/YUV conversions shared across ops)
+PLANE_CACHE_SIZE = 12
+
+# Background Removal (coarse-to-fine masks)
+MATTE_COARSE_SIDE = 800  # segmentation runs at this size, then the boundary is refined
+MATTE_BAND = 2  # uncertain band half-width, in coarse pixels
+MATTE_EPS = 1e-3  # guided upsampling regularization
+
+# AI Background Removal (rembg)
+REMBG_MODEL = 'u2net'
+REMBG_THREADS = os.cpu_count() or 1  # ONNX Runtime intra-op threads
+REMBG_WARMUP = os.environ.get('VISIONLAB_REMBG_WARMUP', '0') == '1'  # load the model at startup
+
+# Upscaling
+UPSCALE_STREAM_PIXELS = 40_000_000  # larger targets are offered as a streamed PNG file
+
+# Frequency Domain
+FFT_WORKERS = os.cpu_count() or 1
+FFT_CACHE_MB = 256  # per-channel spectra kept for repeated filter applies (12 MP color: ~170 MB each)
+
+# Compression Sweeps
+COMPRESSION_WORKERS = os.cpu_count() or 1
+COMPRESSION_MEMORY_MB = 1024  # decode + SSIM buffers of all sweep workers together; caps the pool on big images
+
+# Batch Processing
+BATCH_WORKERS = os.cpu_count() or 1
+BATCH_QUEUE_SIZE = 2  # files in flight per worker
+BATCH_THUMBNAIL_SIDE = 256  # thumbnails use reduced-resolution decode
 
 # Module Categories
 MODULES = {
@@ -49,6 +109,25 @@ MODULES = {
     ]
 }
 
+# Module Renderers (import path, render function)
+MODULE_RENDERERS = {
+    "Test Simple": ("modules.test_simple", "render_test_simple"),
+    "Auto Enhancer": ("modules.auto_enhancer", "render_auto_enhancer"),
+    "Image Upscaler": ("modules.upscaler", "render_upscaler"),
+    "Background Removal": ("modules.background_removal", "render_background_removal"),
+    "Low-Light Enhancer": ("modules.low_light", "render_low_light"),
+    "Image Denoiser": ("modules.denoiser", "render_denoiser"),
+    "Color Enhancement": ("modules.color_enhancement", "render_color_enhancement"),
+    "Filter Gallery": ("modules.filters", "render_filters"),
+    "Edge Detection": ("modules.edge_detection", "render_edge_detection"),
+    "Morphological Operations": ("modules.morphology", "render_morphology"),
+    "Image Segmentation": ("modules.segmentation", "render_segmentation"),
+    "Frequency Domain": ("modules.frequency", "render_frequency"),
+    "Histogram Analyzer": ("modules.histogram", "render_histogram"),
+    "Image Compression": ("modules.compression", "render_compression"),
+    "Batch Processing": ("modules.batch_processing", "render_batch_processing")
+}
+
 # Interpolation Methods
 INTERPOLATION_METHODS = {
     'Nearest Neighbor': cv2.INTER_NEAREST,
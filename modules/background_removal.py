@@ -3,90 +3,15 @@ Background Removal Module
 Remove background from images with multiple methods
 """
 
+from functools import partial
 import streamlit as st
-import cv2
-import numpy as np
-
-def remove_background_grabcut(image, iterations=5):
-    """Remove background using GrabCut algorithm"""
-    # Create mask
-    mask = np.zeros(image.shape[:2], np.uint8)
-    
-    # Define rectangle around the subject (center 80% of image)
-    height, width = image.shape[:2]
-    margin_h = int(height * 0.1)
-    margin_w = int(width * 0.1)
-    rect = (margin_w, margin_h, width - 2*margin_w, height - 2*margin_h)
-    
-    # Initialize background and foreground models
-    bgd_model = np.zeros((1, 65), np.float64)
-    fgd_model = np.zeros((1, 65), np.float64)
-    
-    # Apply GrabCut
-    cv2.grabCut(image, mask, rect, bgd_model, fgd_model, iterations, cv2.GC_INIT_WITH_RECT)
-    
-    # Create binary mask
-    mask2 = np.where((mask == 2) | (mask == 0), 0, 1).astype('uint8')
-    
-    # Apply mask to image
-    result = image * mask2[:, :, np.newaxis]
-    
-    return result, mask2
-
-def remove_background_threshold(image, threshold=240):
-    """Remove white/light backgrounds using simple thresholding"""
-    # Convert to grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    # Create mask (invert so dark areas are kept)
-    _, mask = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY_INV)
-    
-    # Apply morphological operations to clean up
-    kernel = np.ones((5, 5), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-    
-    # Apply mask
-    result = image.copy()
-    result[mask == 0] = [0, 0, 0]  # Set background to black
-    
-    return result, (mask / 255).astype(np.uint8)
-
-def remove_background_color_range(image, lower_color, upper_color):
-    """Remove background based on color range"""
-    # Convert to HSV for better color detection
-    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-    
-    # Create mask
-    mask = cv2.inRange(hsv, lower_color, upper_color)
-    
-    # Invert mask (we want to keep the subject, remove background)
-    mask = cv2.bitwise_not(mask)
-    
-    # Apply morphological operations
-    kernel = np.ones((5, 5), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-    
-    # Apply mask
-    result = image.copy()
-    result[mask == 0] = [0, 0, 0]
-    
-    return result, (mask / 255).astype(np.uint8)
-
-def add_transparent_background(image, mask):
-    """Add alpha channel for transparency"""
-    # Convert to RGBA
-    b, g, r = cv2.split(image)
-    alpha = mask * 255
-    result = cv2.merge([b, g, r, alpha.astype(np.uint8)])
-    return result
-
-def replace_background(image, mask, new_bg_color):
-    """Replace background with custom color"""
-    result = image.copy()
-    result[mask == 0] = new_bg_color
-    return result
+from ops.background import (remove_background_grabcut, remove_background_threshold,
+                            remove_background_color_range, replace_background,
+                            ai_mask, apply_soft_mask)
+from ops.mask import PackedMask, rgba_png_bytes
+from config import ALLOWED_EXTENSIONS
+from utils.image_utils import load_image
+from utils.session import commit_result
 
 def render_background_removal():
     """Render Background Removal UI"""
@@ -105,14 +30,15 @@ def render_background_removal():
         
         iterations = st.slider("Iterations", 1, 10, 5, key="grabcut_iter",
                                help="More iterations = better accuracy but slower")
+        multires = st.checkbox("Coarse-to-fine", value=True, key="grabcut_multires",
+                               help="Segment a downscaled copy, then refine only the boundary at full resolution")
         
         if st.button("🎯 Remove Background", type="primary", use_container_width=True, key="apply_grabcut"):
             with st.spinner("Removing background with GrabCut..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    result, mask = remove_background_grabcut(st.session_state.processed_image, iterations)
-                    st.session_state.processed_image = result
-                    st.session_state['current_mask'] = mask
+                    result, mask = remove_background_grabcut(st.session_state.processed_image, iterations, multires)
+                    commit_result(result, 'remove_bg_grabcut', {'iterations': iterations, 'multires': multires})
+                    st.session_state['current_mask'] = PackedMask.pack(mask)
                     st.success("✅ Background removed!")
                     st.rerun()
                 except Exception as e:
@@ -123,14 +49,15 @@ def render_background_removal():
         
         threshold = st.slider("Threshold", 100, 255, 240, key="threshold_val",
                              help="Higher = removes lighter backgrounds")
+        multires = st.checkbox("Coarse-to-fine", value=False, key="threshold_multires",
+                               help="Clean the mask at low resolution and refine only the boundary")
         
         if st.button("🎯 Remove Background", type="primary", use_container_width=True, key="apply_threshold"):
             with st.spinner("Removing background..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    result, mask = remove_background_threshold(st.session_state.processed_image, threshold)
-                    st.session_state.processed_image = result
-                    st.session_state['current_mask'] = mask
+                    result, mask = remove_background_threshold(st.session_state.processed_image, threshold, multires)
+                    commit_result(result, 'remove_bg_threshold', {'threshold': threshold, 'multires': multires})
+                    st.session_state['current_mask'] = PackedMask.pack(mask)
                     st.success("✅ Background removed!")
                     st.rerun()
                 except Exception as e:
@@ -153,16 +80,19 @@ def render_background_removal():
             upper_s = st.slider("Sat Max", 0, 255, 255, key="upper_s")
             upper_v = st.slider("Val Max", 0, 255, 255, key="upper_v")
         
-        lower = np.array([lower_h, lower_s, lower_v])
-        upper = np.array([upper_h, upper_s, upper_v])
+        lower = (lower_h, lower_s, lower_v)
+        upper = (upper_h, upper_s, upper_v)
+        multires = st.checkbox("Coarse-to-fine", value=False, key="color_range_multires",
+                               help="Clean the mask at low resolution and refine only the boundary")
         
         if st.button("🎯 Remove Background", type="primary", use_container_width=True, key="apply_color_range"):
             with st.spinner("Removing background..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    result, mask = remove_background_color_range(st.session_state.processed_image, lower, upper)
-                    st.session_state.processed_image = result
-                    st.session_state['current_mask'] = mask
+                    result, mask = remove_background_color_range(st.session_state.processed_image, lower, upper,
+                                                                 multires)
+                    commit_result(result, 'remove_bg_color_range', {'lower_color': lower, 'upper_color': upper,
+                                                                    'multires': multires})
+                    st.session_state['current_mask'] = PackedMask.pack(mask)
                     st.success("✅ Background removed!")
                     st.rerun()
                 except Exception as e:
@@ -171,35 +101,15 @@ def render_background_removal():
     else:  # AI-Powered (rembg)
         st.info("🤖 AI-powered background removal using deep learning")
         st.warning("⚠️ Requires 'rembg' library: pip install rembg")
+        st.caption("The model loads once per session; later removals reuse it.")
         
         if st.button("🎯 Remove Background", type="primary", use_container_width=True, key="apply_rembg"):
             with st.spinner("Removing background with AI..."):
                 try:
-                    from rembg import remove
-                    from PIL import Image
-                    
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    
-                    # Convert to PIL
-                    img_rgb = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2RGB)
-                    pil_img = Image.fromarray(img_rgb)
-                    
-                    # Remove background
-                    output = remove(pil_img)
-                    
-                    # Convert back to OpenCV
-                    result = np.array(output)
-                    
-                    # If output has alpha channel, convert to BGR by replacing transparent with black
-                    if result.shape[2] == 4:
-                        mask = result[:, :, 3]
-                        bgr = cv2.cvtColor(result[:, :, :3], cv2.COLOR_RGB2BGR)
-                        bgr[mask == 0] = [0, 0, 0]
-                        result = bgr
-                    else:
-                        result = cv2.cvtColor(result, cv2.COLOR_RGB2BGR)
-                    
-                    st.session_state.processed_image = result
+                    soft = ai_mask(st.session_state.processed_image)
+                    result = apply_soft_mask(st.session_state.processed_image, soft)
+                    commit_result(result, 'remove_bg_ai', {})
+                    st.session_state['current_mask'] = PackedMask.pack(soft, soft=True)
                     st.success("✅ Background removed with AI!")
                     st.rerun()
                 except ImportError:
@@ -212,27 +122,26 @@ def render_background_removal():
         st.markdown("---")
         st.markdown("### 🎨 Background Options")
         
+        mask = st.session_state['current_mask']
+        image = st.session_state.processed_image
+        feather = st.slider("Soft Edges (px)", 0, 20, 0, key="bg_feather",
+                            help="Feather the mask edge; 0 keeps a hard cut")
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
             if st.button("⬛ Black BG", use_container_width=True, key="bg_black"):
-                mask = st.session_state['current_mask']
-                result = replace_background(st.session_state.processed_image, mask, [0, 0, 0])
-                st.session_state.processed_image = result
+                commit_result(replace_background(image, mask, (0, 0, 0), feather))
                 st.rerun()
         
         with col2:
             if st.button("⬜ White BG", use_container_width=True, key="bg_white"):
-                mask = st.session_state['current_mask']
-                result = replace_background(st.session_state.processed_image, mask, [255, 255, 255])
-                st.session_state.processed_image = result
+                commit_result(replace_background(image, mask, (255, 255, 255), feather))
                 st.rerun()
         
         with col3:
             if st.button("🔵 Blue BG", use_container_width=True, key="bg_blue"):
-                mask = st.session_state['current_mask']
-                result = replace_background(st.session_state.processed_image, mask, [255, 0, 0])  # BGR format
-                st.session_state.processed_image = result
+                commit_result(replace_background(image, mask, (255, 0, 0), feather))  # BGR format
                 st.rerun()
         
         # Custom color picker
@@ -245,7 +154,21 @@ def render_background_removal():
             rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
             bgr = (rgb[2], rgb[1], rgb[0])  # Convert to BGR
             
-            mask = st.session_state['current_mask']
-            result = replace_background(st.session_state.processed_image, mask, bgr)
-            st.session_state.processed_image = result
+            commit_result(replace_background(image, mask, bgr, feather))
             st.rerun()
+        
+        # Background image (resized to fit)
+        st.markdown("#### Background Image")
+        bg_file = st.file_uploader("Upload a background", type=ALLOWED_EXTENSIONS, key="bg_image_file")
+        
+        if bg_file is not None and st.button("Apply Background Image", use_container_width=True,
+                                             key="apply_bg_image"):
+            background = load_image(bg_file)
+            if background is not None:
+                commit_result(replace_background(image, mask, background, feather))
+                st.rerun()
+        
+        # Transparent export: image + mask streamed straight into an RGBA PNG
+        st.download_button("📥 Download Transparent PNG", partial(rgba_png_bytes, image, mask, feather=feather),
+                           file_name="visionlab_transparent.png", mime="image/png",
+                           use_container_width=True, key="download_rgba", on_click="ignore")
@@ -2,7 +2,61 @@
 Batch Processing Module - FIXED
 """
 
+import os
+import tempfile
+import zipfile
 import streamlit as st
+from config import BATCH_WORKERS, BATCH_QUEUE_SIZE, BATCH_THUMBNAIL_SIDE
+from ops.registry import list_operations, get_operation
+from ops.pipeline import Pipeline
+from ops.batch import BatchEngine, OUTPUT_FORMATS, STAGES
+from utils.image_utils import display_image, load_preview
+from utils.widgets import operation_params
+
+def _batch_operations():
+    """Operations offered in the batch chain"""
+    return [op.name for op in list_operations() if op.category != "Test Simple"]
+
+def _run_batch(uploaded_files, pipeline, output_format, quality, workers, bake_color=False):
+    """Process all files and write the outputs to a zip on disk"""
+    previous = st.session_state.get('batch_output')
+    if previous and os.path.exists(previous['path']):
+        os.remove(previous['path'])
+    
+    engine = BatchEngine(pipeline, output_format, quality, workers, BATCH_QUEUE_SIZE, bake_color)
+    files = ((f.name, f.getvalue()) for f in uploaded_files)
+    
+    zip_file = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+    progress = st.progress(0.0, text="Starting workers...")
+    
+    with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_STORED) as archive:
+        for result in engine.run(files):
+            if result.ok:
+                archive.writestr(result.name, result.data)
+            done = engine.report.processed
+            progress.progress(done / len(uploaded_files),
+                              text=f"{done}/{len(uploaded_files)} • {engine.report.throughput:.1f} img/s")
+    zip_file.close()
+    
+    st.session_state['batch_output'] = {'path': zip_file.name, 'report': engine.report}
+
+def _show_report(report):
+    """Display throughput, stage timing and failures"""
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Throughput", f"{report.throughput:.2f} img/s")
+    col2.metric("Succeeded", f"{report.succeeded}/{report.processed}")
+    col3.metric("Wall Time", f"{report.elapsed:.1f} s")
+    
+    st.markdown("**Time per stage (summed over workers)**")
+    stage_cols = st.columns(len(STAGES))
+    for col, stage in zip(stage_cols, STAGES):
+        total = report.stage_times[stage]
+        per_image = total / report.processed if report.processed else 0.0
+        col.metric(stage.title(), f"{total:.2f} s", f"{per_image * 1000:.0f} ms/img", delta_color="off")
+    
+    if report.failures:
+        st.error(f"❌ {len(report.failures)} file(s) failed")
+        st.table([{'File': name, 'Error': error} for name, error in report.failures])
 
 def render_batch_processing():
     """Render Batch Processing UI"""
@@ -16,14 +70,58 @@ def render_batch_processing():
     if uploaded_files:
         st.success(f"✅ {len(uploaded_files)} images uploaded!")
         
-        st.info("🚧 Batch processing functionality coming soon!")
-        st.write("This module will allow you to apply the same operations to multiple images at once.")
+        # Operation chain
+        st.markdown("### 🔗 Operation Chain")
+        op_names = st.multiselect("Operations (applied in order)", _batch_operations(),
+                                  format_func=lambda name: get_operation(name).label,
+                                  key="batch_ops")
+        
+        pipeline = Pipeline()
+        for i, name in enumerate(op_names):
+            op = get_operation(name)
+            with st.expander(f"{i + 1}. {op.label}", expanded=bool(op.params)):
+                params = operation_params(op, f"batch_{i}_{name}")
+            pipeline.add(name, **params)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            output_format = st.selectbox("Output Format", list(OUTPUT_FORMATS), key="batch_format")
+        with col2:
+            quality = st.slider("Quality (JPEG/WebP)", 1, 100, 95, key="batch_quality")
+        with col3:
+            if BATCH_WORKERS > 1:
+                workers = st.slider("Workers", 1, BATCH_WORKERS, BATCH_WORKERS, key="batch_workers")
+            else:
+                # A slider needs min < max; a single core leaves nothing to choose
+                workers = 1
+                st.caption("Workers: 1 (single CPU)")
+        
+        bake_color = st.checkbox("🎞️ Bake color steps into a 3D LUT", value=False, key="batch_bake_color",
+                                 help="Two or more chained HSV/sepia steps (with any point steps between them) "
+                                      "run as one exact color-table lookup")
+        
+        if st.button("⚡ Process Batch", type="primary", use_container_width=True, key="run_batch",
+                     disabled=len(pipeline) == 0):
+            try:
+                _run_batch(uploaded_files, pipeline, output_format, quality, workers, bake_color)
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+        
+        output = st.session_state.get('batch_output')
+        if output and os.path.exists(output['path']):
+            st.markdown("### 📊 Results")
+            _show_report(output['report'])
+            with open(output['path'], 'rb') as f:
+                st.download_button("📦 Download ZIP", f, "batch_output.zip", "application/zip",
+                                   use_container_width=True, key="batch_download")
         
         # Show thumbnails
         st.markdown("### Uploaded Images")
         cols = st.columns(min(4, len(uploaded_files)))
         for idx, file in enumerate(uploaded_files[:4]):
             with cols[idx]:
-                st.image(file, caption=file.name, use_column_width=True)
+                thumbnail = load_preview(file, BATCH_THUMBNAIL_SIDE)
+                if thumbnail is not None:
+                    display_image(thumbnail, caption=file.name)
     else:
         st.info("👆 Upload multiple images to process them in batch")
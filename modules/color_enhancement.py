@@ -2,47 +2,31 @@
 Color Enhancement Module - FIXED
 """
 
+from functools import partial
 import streamlit as st
-import cv2
-import numpy as np
-
-def adjust_hsv(image, hue_shift=0, saturation_scale=1.0, value_scale=1.0):
-    """Adjust HSV values"""
-    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV).astype(np.float32)
-    hsv[:, :, 0] = (hsv[:, :, 0] + hue_shift) % 180
-    hsv[:, :, 1] = np.clip(hsv[:, :, 1] * saturation_scale, 0, 255)
-    hsv[:, :, 2] = np.clip(hsv[:, :, 2] * value_scale, 0, 255)
-    return cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2BGR)
-
-def auto_white_balance(image):
-    """Auto white balance"""
-    result = image.astype(np.float32)
-    avg_b, avg_g, avg_r = np.mean(result[:, :, 0]), np.mean(result[:, :, 1]), np.mean(result[:, :, 2])
-    gray = (avg_b + avg_g + avg_r) / 3
-    
-    result[:, :, 0] = np.clip(result[:, :, 0] * (gray / avg_b), 0, 255)
-    result[:, :, 1] = np.clip(result[:, :, 1] * (gray / avg_g), 0, 255)
-    result[:, :, 2] = np.clip(result[:, :, 2] * (gray / avg_r), 0, 255)
-    
-    return result.astype(np.uint8)
+from ops.color_lut import ColorLUT
+from ops.pipeline import Pipeline
+from utils.session import commit_result, run_operation
+from utils.widgets import live_preview
 
 def render_color_enhancement():
     """Render Color Enhancement UI"""
     st.markdown("### ⚙️ Settings")
     
-    tab1, tab2 = st.tabs(["🎨 HSV Adjustment", "⚡ Quick Tools"])
+    tab1, tab2, tab3 = st.tabs(["🎨 HSV Adjustment", "⚡ Quick Tools", "🎞️ 3D LUT"])
     
     with tab1:
         hue_shift = st.slider("Hue Shift", -180, 180, 0, key="color_hue")
         saturation = st.slider("Saturation", 0, 200, 100, key="color_sat")
         value = st.slider("Brightness", 0, 200, 100, key="color_val")
+        live_preview('adjust_hsv', "hsv", hue_shift=hue_shift, saturation_scale=saturation/100.0,
+                     value_scale=value/100.0)
         
         if st.button("🎨 Apply HSV", type="primary", use_container_width=True, key="apply_hsv"):
             with st.spinner("Applying HSV adjustments..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    result = adjust_hsv(st.session_state.processed_image, hue_shift, saturation/100.0, value/100.0)
-                    st.session_state.processed_image = result
+                    run_operation('adjust_hsv', hue_shift=hue_shift, saturation_scale=saturation/100.0,
+                                  value_scale=value/100.0)
                     st.success("✅ HSV adjustments applied!")
                     st.rerun()
                 except Exception as e:
@@ -55,9 +39,7 @@ def render_color_enhancement():
             if st.button("🔘 Auto White Balance", use_container_width=True, key="apply_wb"):
                 with st.spinner("Applying white balance..."):
                     try:
-                        st.session_state.history.append(st.session_state.processed_image.copy())
-                        result = auto_white_balance(st.session_state.processed_image)
-                        st.session_state.processed_image = result
+                        run_operation('white_balance')
                         st.success("✅ White balance applied!")
                         st.rerun()
                     except Exception as e:
@@ -67,12 +49,42 @@ def render_color_enhancement():
             if st.button("📊 Histogram Eq", use_container_width=True, key="apply_histeq"):
                 with st.spinner("Equalizing histogram..."):
                     try:
-                        st.session_state.history.append(st.session_state.processed_image.copy())
-                        yuv = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2YUV)
-                        yuv[:, :, 0] = cv2.equalizeHist(yuv[:, :, 0])
-                        result = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
-                        st.session_state.processed_image = result
+                        run_operation('equalize_hist')
                         st.success("✅ Histogram equalized!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
+    
+    with tab3:
+        cube_file = st.file_uploader("Import .cube LUT", type=['cube'], key="cube_upload")
+        if cube_file is not None:
+            if st.button("🎞️ Apply LUT", type="primary", use_container_width=True, key="apply_cube"):
+                with st.spinner("Applying LUT..."):
+                    try:
+                        lut = ColorLUT.from_cube(cube_file.getvalue())
+                        commit_result(lut.apply(st.session_state.processed_image))
+                        st.success(f"✅ LUT applied ({lut.size}³)!")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error: {str(e)}")
+        
+        st.markdown("**Export grade as .cube**")
+        include_sepia = st.checkbox("Include sepia", value=False, key="cube_sepia")
+        grade = Pipeline().add('adjust_hsv', hue_shift=hue_shift, saturation_scale=saturation/100.0,
+                               value_scale=value/100.0)
+        if include_sepia:
+            grade.add('sepia')
+        # Baked and serialized only when the button is clicked, not on every rerun
+        st.download_button(
+            "💾 Download .cube (current HSV settings)",
+            partial(_grade_cube, grade),
+            "grade.cube",
+            "text/plain",
+            on_click="ignore",
+            use_container_width=True,
+            key="export_cube"
+        )
+
+def _grade_cube(grade):
+    """.cube text for a color pipeline"""
+    return ColorLUT.from_pipeline(grade).to_cube("VisionLab Pro grade")
@@ -4,34 +4,115 @@ Image Compression Module - FIXED
 
 import streamlit as st
 import cv2
-import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from ops.cache import image_version
+from ops.compression import CODECS, jpeg_encode, jpeg_decode, encode, search, sweep
+from utils.session import commit_result
+
+FORMAT_COLORS = {'JPEG': '#FF4B4B', 'WEBP': '#1F77B4', 'PNG': '#2CA02C'}
+
+def _rd_figure(points):
+    """Size vs PSNR / SSIM, one trace per format"""
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Size vs PSNR", "Size vs SSIM"))
+    for fmt in CODECS:
+        series = [p for p in points if p.format == fmt]
+        if not series:
+            continue
+        sizes = [p.size / 1024 for p in series]
+        labels = [f"{fmt} {p.level}" for p in series]
+        color = FORMAT_COLORS[fmt]
+        # Lossless PNG has infinite PSNR; plot it on the SSIM panel only
+        psnr = [p.psnr if p.psnr != float('inf') else None for p in series]
+        fig.add_trace(go.Scatter(x=sizes, y=psnr, mode='lines+markers', name=fmt, text=labels,
+                                 line=dict(color=color)), row=1, col=1)
+        fig.add_trace(go.Scatter(x=sizes, y=[p.ssim for p in series], mode='lines+markers', name=fmt,
+                                 text=labels, line=dict(color=color), showlegend=False), row=1, col=2)
+    fig.update_xaxes(title_text="Size (KB)", type="log")
+    fig.update_yaxes(title_text="PSNR (dB)", row=1, col=1)
+    fig.update_yaxes(title_text="SSIM", row=1, col=2)
+    fig.update_layout(height=360, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
 
 def render_compression():
     """Render Compression UI"""
     st.markdown("### 💾 Image Compression")
     
-    quality = st.slider("JPEG Quality", 1, 100, 90, key="compression_quality",
-                       help="Higher = better quality, larger file")
+    tab1, tab2, tab3 = st.tabs(["🗜️ Compress", "📉 Rate–Distortion", "🎯 Target Search"])
+    image = st.session_state.processed_image
+    
+    with tab1:
+        quality = st.slider("JPEG Quality", 1, 100, 90, key="compression_quality",
+                           help="Higher = better quality, larger file")
+        
+        if st.button("🗜️ Compress", type="primary", use_container_width=True, key="apply_compression"):
+            with st.spinner("Compressing..."):
+                try:
+                    # Simulate JPEG compression
+                    encimg = jpeg_encode(image, quality)
+                    commit_result(jpeg_decode(encimg), 'jpeg_compress', {'quality': quality})
+                    
+                    # Calculate compression ratio
+                    original_size = st.session_state.original_image.nbytes
+                    compressed_size = len(encimg)
+                    ratio = original_size / compressed_size
+                    
+                    st.success(f"✅ Compressed! Ratio: {ratio:.2f}:1")
+                    st.info(f"Original: {original_size/1024:.1f} KB → Compressed: {compressed_size/1024:.1f} KB")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+    
+    with tab2:
+        formats = st.multiselect("Formats", list(CODECS), default=['JPEG', 'WEBP'], key="rd_formats")
+        
+        if st.button("📉 Run Sweep", type="primary", use_container_width=True, key="run_rd_sweep",
+                     disabled=not formats):
+            with st.spinner("Encoding at every quality level..."):
+                try:
+                    points = sweep(image, formats)
+                    st.session_state.rd_sweep = (image_version(image), points)
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+        
+        result = st.session_state.get('rd_sweep')
+        if result and result[0] == image_version(image):
+            points = result[1]
+            st.plotly_chart(_rd_figure(points), use_container_width=True)
+            st.dataframe([dict(p.as_dict(), size=f"{p.size / 1024:.1f} KB") for p in points],
+                         use_container_width=True, hide_index=True)
     
-    if st.button("🗜️ Compress", type="primary", use_container_width=True, key="apply_compression"):
-        with st.spinner("Compressing..."):
-            try:
-                st.session_state.history.append(st.session_state.processed_image.copy())
-                
-                # Simulate JPEG compression
-                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
-                _, encimg = cv2.imencode('.jpg', st.session_state.processed_image, encode_param)
-                result = cv2.imdecode(encimg, 1)
-                
-                st.session_state.processed_image = result
-                
-                # Calculate compression ratio
-                original_size = st.session_state.original_image.nbytes
-                compressed_size = len(encimg)
-                ratio = original_size / compressed_size
-                
-                st.success(f"✅ Compressed! Ratio: {ratio:.2f}:1")
-                st.info(f"Original: {original_size/1024:.1f} KB → Compressed: {compressed_size/1024:.1f} KB")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+    with tab3:
+        col1, col2 = st.columns(2)
+        with col1:
+            search_format = st.selectbox("Format", [f for f in CODECS if CODECS[f][4]], key="search_format")
+            target_kb = st.number_input("Max Size (KB, 0 = no limit)", 0, 100000, 200, key="search_target_kb")
+        with col2:
+            min_psnr = st.number_input("Min PSNR (dB, 0 = none)", 0.0, 60.0, 0.0, 0.5, key="search_min_psnr")
+            min_ssim = st.number_input("Min SSIM (0 = none)", 0.0, 1.0, 0.0, 0.01, key="search_min_ssim")
+        
+        if st.button("🎯 Find Smallest Encoding", type="primary", use_container_width=True, key="run_search"):
+            with st.spinner("Searching quality levels..."):
+                try:
+                    point, tries = search(image, search_format,
+                                          target_bytes=target_kb * 1024 if target_kb else None,
+                                          min_psnr=min_psnr or None, min_ssim=min_ssim or None)
+                    st.session_state.compression_search = (image_version(image), point, tries)
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+        
+        result = st.session_state.get('compression_search')
+        if result and result[0] == image_version(image):
+            _, point, tries = result
+            if point is None:
+                st.warning(f"No {search_format} quality meets these constraints ({tries} encodes tried)")
+            else:
+                st.success(f"✅ {point.format} quality {point.level}: {point.size / 1024:.1f} KB "
+                           f"({tries} encodes tried)")
+                if point.psnr is not None:
+                    st.info(f"PSNR {point.psnr:.2f} dB · SSIM {point.ssim:.4f}")
+                if st.button("✅ Apply This Encoding", use_container_width=True, key="apply_search"):
+                    op = 'jpeg_compress' if point.format == 'JPEG' else 'webp_compress'
+                    decoded = cv2.imdecode(encode(image, point.format, point.level), cv2.IMREAD_UNCHANGED)
+                    commit_result(decoded, op, {'quality': point.level})
+                    st.rerun()
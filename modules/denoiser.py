@@ -3,7 +3,12 @@ Image Denoiser Module - FIXED
 """
 
 import streamlit as st
-import cv2
+from config import NLM_TILE_SIZE
+from ops.tiling import CancelToken, Cancelled
+from ops.blur import BLUR_ENGINES
+from ops.smoothing import SMOOTHING_ENGINES, compare_engines
+from utils.session import run_operation
+from utils.widgets import smoothing_engine
 
 def render_denoiser():  # ← Make sure it's render_denoiser (with 'r' at the end)
     """Render Denoiser UI"""
@@ -16,14 +21,14 @@ def render_denoiser():  # ← Make sure it's render_denoiser (with 'r' at the en
     st.markdown("---")
     
     if filter_type == 'Gaussian Blur':
-        kernel_size = st.slider("Kernel Size", 3, 31, 5, 2, key="gauss_kernel")
+        kernel_size = st.slider("Kernel Size", 3, 99, 5, 2, key="gauss_kernel")
+        engine = st.selectbox("Blur Engine", BLUR_ENGINES, key="gauss_engine",
+                              help="auto: direct kernel for small sizes, stacked box filters for large ones")
         
         if st.button("🧹 Apply Gaussian Blur", type="primary", use_container_width=True, key="apply_gauss"):
             with st.spinner("Applying Gaussian Blur..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    result = cv2.GaussianBlur(st.session_state.processed_image, (kernel_size, kernel_size), 0)
-                    st.session_state.processed_image = result
+                    run_operation('gaussian_blur', kernel_size=kernel_size, engine=engine)
                     st.success("✅ Gaussian Blur applied!")
                     st.rerun()
                 except Exception as e:
@@ -35,9 +40,7 @@ def render_denoiser():  # ← Make sure it's render_denoiser (with 'r' at the en
         if st.button("🧹 Apply Median Filter", type="primary", use_container_width=True, key="apply_median"):
             with st.spinner("Applying Median Filter..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    result = cv2.medianBlur(st.session_state.processed_image, kernel_size)
-                    st.session_state.processed_image = result
+                    run_operation('median_blur', kernel_size=kernel_size)
                     st.success("✅ Median Filter applied!")
                     st.rerun()
                 except Exception as e:
@@ -46,21 +49,27 @@ def render_denoiser():  # ← Make sure it's render_denoiser (with 'r' at the en
     elif filter_type == 'Bilateral Filter':
         col1, col2 = st.columns(2)
         with col1:
-            d = st.slider("Diameter", 3, 15, 9, key="bilateral_d")
+            d = st.slider("Diameter", 3, 31, 9, key="bilateral_d")
             sigma_color = st.slider("Color Sigma", 10, 200, 75, key="bilateral_color")
         with col2:
             sigma_space = st.slider("Space Sigma", 10, 200, 75, key="bilateral_space")
+            engine = smoothing_engine("bilateral_engine")
         
         if st.button("🧹 Apply Bilateral Filter", type="primary", use_container_width=True, key="apply_bilateral"):
             with st.spinner("Applying Bilateral Filter..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    result = cv2.bilateralFilter(st.session_state.processed_image, d, sigma_color, sigma_space)
-                    st.session_state.processed_image = result
+                    run_operation('bilateral', d=d, sigma_color=sigma_color, sigma_space=sigma_space, engine=engine)
                     st.success("✅ Bilateral Filter applied!")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
+        
+        if st.button("⚖️ Compare Engines", use_container_width=True, key="compare_engines"):
+            with st.spinner("Running every engine..."):
+                results = compare_engines(st.session_state.processed_image, d, sigma_color, sigma_space)
+            st.dataframe([{'Engine': SMOOTHING_ENGINES[name], 'PSNR vs exact (dB)': round(r['PSNR'], 2),
+                           'SSIM vs exact': round(r['SSIM'], 4), 'Time (s)': round(r['seconds'], 3)}
+                          for name, r in results.items()], use_container_width=True, hide_index=True)
     
     else:  # Non-Local Means
         col1, col2 = st.columns(2)
@@ -70,16 +79,28 @@ def render_denoiser():  # ← Make sure it's render_denoiser (with 'r' at the en
         with col2:
             search_size = st.slider("Search Window", 11, 31, 21, 2, key="nlm_search")
         
-        if st.button("🧹 Apply Non-Local Means", type="primary", use_container_width=True, key="apply_nlm"):
-            with st.spinner("Applying Non-Local Means..."):
-                try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    if len(st.session_state.processed_image.shape) == 3:
-                        result = cv2.fastNlMeansDenoisingColored(st.session_state.processed_image, None, h, h, template_size, search_size)
-                    else:
-                        result = cv2.fastNlMeansDenoising(st.session_state.processed_image, None, h, template_size, search_size)
-                    st.session_state.processed_image = result
-                    st.success("✅ Non-Local Means applied!")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error: {str(e)}")
+        col1, col2 = st.columns([3, 1])
+        apply = col1.button("🧹 Apply Non-Local Means", type="primary", use_container_width=True, key="apply_nlm")
+        # Clicking Cancel mid-run reruns the script, which stops the run between tiles
+        cancelled = col2.button("⏹️ Cancel", use_container_width=True, key="cancel_nlm")
+        
+        if apply:
+            bar = st.progress(0.0, text="Starting Non-Local Means...")
+            
+            def progress(done, total, eta):
+                text = f"Tile {done}/{total}"
+                if eta is not None and done < total:
+                    text += f" · about {eta:.0f}s left"
+                bar.progress(done / total, text=text)
+            
+            try:
+                run_operation('nl_means', progress=progress, cancel=CancelToken(), tile_size=NLM_TILE_SIZE,
+                              h=h, template_size=template_size, search_size=search_size)
+                st.success("✅ Non-Local Means applied!")
+                st.rerun()
+            except Cancelled:
+                st.warning("Non-Local Means cancelled")
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+        elif cancelled:
+            st.info("⏹️ Non-Local Means cancelled before it finished; nothing was applied")
@@ -3,8 +3,16 @@ Edge Detection Module - FIXED
 """
 
 import streamlit as st
-import cv2
-import numpy as np
+from ops.cache import image_version
+from ops.edges import canny_sweep
+from ops.proxy import downscale
+from utils.session import run_operation
+from utils.widgets import live_preview
+
+SWEEP_LOWS = (25, 50, 100)
+SWEEP_HIGHS = (100, 150, 200, 300)
+SWEEP_THUMBNAIL_SIDE = 320
+SWEEP_COLUMNS = 3
 
 def render_edge_detection():
     """Render Edge Detection UI"""
@@ -20,34 +28,28 @@ def render_edge_detection():
             low_threshold = st.slider("Low Threshold", 0, 200, 50, key="canny_low")
         with col2:
             high_threshold = st.slider("High Threshold", 0, 300, 150, key="canny_high")
+        live_preview('canny', "canny", low_threshold=low_threshold, high_threshold=high_threshold)
         
         if st.button("🔲 Detect Edges", type="primary", use_container_width=True, key="apply_canny"):
             with st.spinner("Detecting edges with Canny..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    gray = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2GRAY)
-                    edges = cv2.Canny(gray, low_threshold, high_threshold)
-                    result = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-                    st.session_state.processed_image = result
+                    run_operation('canny', low_threshold=low_threshold, high_threshold=high_threshold)
                     st.success("✅ Canny edge detection applied!")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
+        
+        with st.expander("🔍 Threshold Sweep"):
+            _render_canny_sweep()
     
     elif method == 'Sobel':
         ksize = st.select_slider("Kernel Size", options=[1, 3, 5, 7], value=3, key="sobel_ksize")
+        live_preview('sobel', "sobel", ksize=ksize)
         
         if st.button("🔲 Detect Edges", type="primary", use_container_width=True, key="apply_sobel"):
             with st.spinner("Detecting edges with Sobel..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    gray = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2GRAY)
-                    sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=ksize)
-                    sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=ksize)
-                    magnitude = np.sqrt(sobelx**2 + sobely**2)
-                    magnitude = np.uint8(magnitude * 255 / magnitude.max())
-                    result = cv2.cvtColor(magnitude, cv2.COLOR_GRAY2BGR)
-                    st.session_state.processed_image = result
+                    run_operation('sobel', ksize=ksize)
                     st.success("✅ Sobel edge detection applied!")
                     st.rerun()
                 except Exception as e:
@@ -55,17 +57,46 @@ def render_edge_detection():
     
     else:  # Laplacian
         ksize = st.select_slider("Kernel Size", options=[1, 3, 5, 7], value=3, key="laplacian_ksize")
+        live_preview('laplacian', "laplacian", ksize=ksize)
         
         if st.button("🔲 Detect Edges", type="primary", use_container_width=True, key="apply_laplacian"):
             with st.spinner("Detecting edges with Laplacian..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    gray = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2GRAY)
-                    laplacian = cv2.Laplacian(gray, cv2.CV_64F, ksize=ksize)
-                    laplacian = np.uint8(np.absolute(laplacian))
-                    result = cv2.cvtColor(laplacian, cv2.COLOR_GRAY2BGR)
-                    st.session_state.processed_image = result
+                    run_operation('laplacian', ksize=ksize)
                     st.success("✅ Laplacian edge detection applied!")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
+
+def _render_canny_sweep():
+    """Compare a grid of Canny thresholds computed from one set of gradients"""
+    image = st.session_state.processed_image
+    lows = st.multiselect("Low thresholds", list(range(0, 201, 25)), list(SWEEP_LOWS), key="sweep_lows")
+    highs = st.multiselect("High thresholds", list(range(50, 301, 50)), list(SWEEP_HIGHS), key="sweep_highs")
+    
+    if st.button("Run Sweep", use_container_width=True, key="run_canny_sweep"):
+        with st.spinner("Sweeping thresholds..."):
+            # Only thumbnails are kept in the session
+            results = [(pair, downscale(edges, SWEEP_THUMBNAIL_SIDE)[0])
+                       for pair, edges in canny_sweep(image, sorted(lows), sorted(highs))]
+            st.session_state.canny_sweep = (image_version(image), results)
+    
+    sweep = st.session_state.get('canny_sweep')
+    if not sweep or sweep[0] != image_version(image):
+        return
+    results = sweep[1]
+    if not results:
+        st.info("No pairs with low < high")
+        return
+    
+    for start in range(0, len(results), SWEEP_COLUMNS):
+        for col, ((low, high), thumbnail) in zip(st.columns(SWEEP_COLUMNS), results[start:start + SWEEP_COLUMNS]):
+            col.image(thumbnail, caption=f"{low} / {high}", use_container_width=True)
+    
+    labels = [f"{low} / {high}" for (low, high), _ in results]
+    choice = st.selectbox("Thresholds to apply", range(len(results)), format_func=labels.__getitem__,
+                          key="sweep_choice")
+    if st.button("Apply Selected", use_container_width=True, key="apply_canny_sweep"):
+        low, high = results[choice][0]
+        run_operation('canny', low_threshold=low, high_threshold=high)
+        st.rerun()
@@ -3,37 +3,40 @@ Frequency Domain Module - FIXED
 """
 
 import streamlit as st
-import cv2
-import numpy as np
-import matplotlib.pyplot as plt
+from ops.frequency import magnitude_spectrum
+from ops.registry import list_operations
+from utils.image_utils import display_image
+from utils.session import run_operation
+from utils.widgets import operation_params
 
 def render_frequency():
     """Render Frequency Domain UI"""
     st.markdown("### 📊 Frequency Domain Analysis")
     
     if st.button("🔄 Compute FFT", type="primary", use_container_width=True, key="compute_fft"):
+        st.session_state.show_spectrum = True
+    
+    if st.session_state.get('show_spectrum'):
         with st.spinner("Computing FFT..."):
             try:
-                gray = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2GRAY)
-                
-                # FFT
-                f = np.fft.fft2(gray)
-                fshift = np.fft.fftshift(f)
-                magnitude_spectrum = 20 * np.log(np.abs(fshift) + 1)
-                
-                # Display
-                fig, ax = plt.subplots(1, 2, figsize=(12, 5))
-                ax[0].imshow(gray, cmap='gray')
-                ax[0].set_title('Original Image')
-                ax[0].axis('off')
-                
-                ax[1].imshow(magnitude_spectrum, cmap='gray')
-                ax[1].set_title('Magnitude Spectrum')
-                ax[1].axis('off')
-                
-                st.pyplot(fig)
-                plt.close()
-                st.success("✅ FFT computed!")
+                # Spectrum is cached per image version, so reruns don't recompute it
+                spectrum = magnitude_spectrum(st.session_state.processed_image)
+                display_image(spectrum, caption="Magnitude Spectrum (log, centered)")
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
+    
+    st.markdown("### 🎚️ Frequency Filters")
+    operations = list_operations('Frequency Domain')
+    op = st.selectbox("Filter", operations, format_func=lambda o: o.label, key="freq_filter")
+    params = operation_params(op, f"freq_{op.name}")
+    st.caption("Frequencies are in cycles per image, so settings carry over between resolutions.")
+    
+    if st.button("🎚️ Apply Filter", use_container_width=True, key="apply_freq_filter"):
+        with st.spinner("Filtering..."):
+            try:
+                run_operation(op.name, **params)
+                st.success(f"✅ {op.label} applied!")
+                st.rerun()
             except Exception as e:
                 st.error(f"Error: {str(e)}")
     
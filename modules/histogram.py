@@ -3,56 +3,81 @@ Histogram Analyzer Module - FIXED
 """
 
 import streamlit as st
-import cv2
 import numpy as np
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+from ops.histogram import histograms
+from utils.session import run_operation
+
+CHANNEL_COLORS = ('blue', 'green', 'red')
+LEVELS = np.arange(256)
+
+def _histogram_figure(hist, cumulative):
+    """Plotly figure from cached histograms (256 points per trace)"""
+    fig = go.Figure()
+    if len(hist.channels) == 3:
+        for i, color in enumerate(CHANNEL_COLORS):
+            y = hist.cumulative[i] / hist.total if cumulative else hist.channels[i]
+            fig.add_trace(go.Scatter(x=LEVELS, y=y, mode='lines', name=color[0].upper(),
+                                     line=dict(color=color, width=1)))
+        title = 'Color Histogram (B, G, R)'
+    else:
+        title = 'Grayscale Histogram'
+    
+    y = hist.cumulative_luminance / hist.total if cumulative else hist.luminance
+    fig.add_trace(go.Scatter(x=LEVELS, y=y, mode='lines', name='Luminance',
+                             line=dict(color='gray', width=1, dash='dot')))
+    
+    fig.update_layout(title=('Cumulative ' if cumulative else '') + title, height=320,
+                      margin=dict(l=10, r=10, t=40, b=10),
+                      xaxis=dict(title='Pixel Value', range=[0, 255]),
+                      yaxis=dict(title='Fraction' if cumulative else 'Frequency'))
+    return fig
 
 def render_histogram():
     """Render Histogram Analyzer UI"""
     st.markdown("### 📈 Histogram Analysis")
     
     if st.button("📊 Show Histogram", type="primary", use_container_width=True, key="show_histogram"):
+        st.session_state.show_histogram_plot = True
+    
+    if st.session_state.get('show_histogram_plot'):
         try:
-            image = st.session_state.processed_image
-            colors = ('b', 'g', 'r')
-            fig, ax = plt.subplots(figsize=(10, 4))
+            # Cached per image version: reruns and other modules reuse the counts
+            hist = histograms(st.session_state.processed_image)
+            cumulative = st.checkbox("Cumulative", value=False, key="hist_cumulative")
+            st.plotly_chart(_histogram_figure(hist, cumulative), use_container_width=True)
             
-            if len(image.shape) == 3:
-                for i, color in enumerate(colors):
-                    hist = cv2.calcHist([image], [i], None, [256], [0, 256])
-                    ax.plot(hist, color=color)
-                ax.set_title('Color Histogram (B, G, R)')
-            else:
-                hist = cv2.calcHist([image], [0], None, [256], [0, 256])
-                ax.plot(hist, color='black')
-                ax.set_title('Grayscale Histogram')
-            
-            ax.set_xlabel('Pixel Value')
-            ax.set_ylabel('Frequency')
-            ax.set_xlim([0, 256])
-            
-            st.pyplot(fig)
-            plt.close()
-            st.success("✅ Histogram generated!")
+            shadows, highlights = hist.clipped()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Mean Luminance", f"{hist.mean():.1f}")
+            col2.metric("Clipped Shadows", f"{shadows:.2%}")
+            col3.metric("Clipped Highlights", f"{highlights:.2%}")
+            if max(shadows, highlights) > 0.05:
+                st.warning("⚠️ More than 5% of pixels are clipped")
         except Exception as e:
             st.error(f"Error: {str(e)}")
     
     st.markdown("---")
     
-    if st.button("⚖️ Equalize Histogram", use_container_width=True, key="equalize_hist"):
-        with st.spinner("Equalizing histogram..."):
-            try:
-                st.session_state.history.append(st.session_state.processed_image.copy())
-                
-                if len(st.session_state.processed_image.shape) == 3:
-                    yuv = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2YUV)
-                    yuv[:, :, 0] = cv2.equalizeHist(yuv[:, :, 0])
-                    result = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
-                else:
-                    result = cv2.equalizeHist(st.session_state.processed_image)
-                
-                st.session_state.processed_image = result
-                st.success("✅ Histogram equalized!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("⚖️ Equalize Histogram", use_container_width=True, key="equalize_hist"):
+            with st.spinner("Equalizing histogram..."):
+                try:
+                    run_operation('equalize_hist')
+                    st.success("✅ Histogram equalized!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+    
+    with col2:
+        clip_percent = st.slider("Auto Levels Clip (%)", 0.0, 10.0, 0.5, 0.1, key="levels_clip")
+        if st.button("📐 Auto Levels", use_container_width=True, key="auto_levels"):
+            with st.spinner("Stretching levels..."):
+                try:
+                    run_operation('auto_levels', clip_percent=clip_percent)
+                    st.success("✅ Levels stretched!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
@@ -3,31 +3,8 @@ Low-Light Enhancer Module - FIXED
 """
 
 import streamlit as st
-import cv2
-import numpy as np
-
-def enhance_low_light(image, gamma=2.2, clahe_strength=2.0, denoise_strength=5):
-    """Enhance low-light images"""
-    result = image.copy().astype(np.float32) / 255.0
-    
-    # Gamma correction
-    result = np.power(result, 1.0 / gamma)
-    result = (result * 255).astype(np.uint8)
-    
-    # CLAHE in HSV
-    if len(result.shape) == 3:
-        hsv = cv2.cvtColor(result, cv2.COLOR_BGR2HSV)
-        h, s, v = cv2.split(hsv)
-        clahe = cv2.createCLAHE(clipLimit=clahe_strength, tileGridSize=(8, 8))
-        v = clahe.apply(v)
-        hsv = cv2.merge([h, s, v])
-        result = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-    
-    # Denoise
-    if denoise_strength > 0:
-        result = cv2.bilateralFilter(result, denoise_strength, 75, 75)
-    
-    return result
+from utils.session import run_operation
+from utils.widgets import live_preview, smoothing_engine
 
 def render_low_light():
     """Render Low-Light Enhancer UI"""
@@ -62,15 +39,17 @@ def render_low_light():
     gamma = st.slider("Brightness (Gamma)", 1.0, 3.5, gamma_val, 0.1, key="lowlight_gamma")
     clahe_strength = st.slider("Contrast Enhancement", 1.0, 5.0, clahe_val, 0.5, key="lowlight_clahe")
     denoise_strength = st.slider("Denoise Strength", 0, 15, denoise_val, 1, key="lowlight_denoise")
+    engine = smoothing_engine("lowlight_engine")
+    live_preview('low_light', "lowlight", gamma=gamma, clahe_strength=clahe_strength,
+                 denoise_strength=denoise_strength, engine=engine)
     
     apply_btn = st.button("🌙 Enhance", type="primary", use_container_width=True, key="apply_lowlight")
     
     if apply_btn or preset_clicked:
         with st.spinner("Enhancing low-light image..."):
             try:
-                st.session_state.history.append(st.session_state.processed_image.copy())
-                enhanced = enhance_low_light(st.session_state.processed_image, gamma, clahe_strength, denoise_strength)
-                st.session_state.processed_image = enhanced
+                run_operation('low_light', gamma=gamma, clahe_strength=clahe_strength,
+                              denoise_strength=denoise_strength, engine=engine)
                 st.success("✅ Low-light enhancement applied!")
                 st.rerun()
             except Exception as e:
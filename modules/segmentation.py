@@ -3,8 +3,8 @@ Image Segmentation Module - FIXED
 """
 
 import streamlit as st
-import cv2
-import numpy as np
+from utils.session import run_operation
+from utils.widgets import live_preview
 
 def render_segmentation():
     """Render Segmentation UI"""
@@ -16,15 +16,12 @@ def render_segmentation():
     
     if method == 'Global Threshold':
         threshold = st.slider("Threshold Value", 0, 255, 127, key="seg_global_thresh")
+        live_preview('global_threshold', "seg_global", threshold=threshold)
         
         if st.button("🎯 Segment", type="primary", use_container_width=True, key="apply_global_thresh"):
             with st.spinner("Segmenting..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    gray = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2GRAY)
-                    _, thresh = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY)
-                    result = cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
-                    st.session_state.processed_image = result
+                    run_operation('global_threshold', threshold=threshold)
                     st.success("✅ Global threshold applied!")
                     st.rerun()
                 except Exception as e:
@@ -34,11 +31,7 @@ def render_segmentation():
         if st.button("🎯 Segment", type="primary", use_container_width=True, key="apply_otsu"):
             with st.spinner("Segmenting with Otsu..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    gray = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2GRAY)
-                    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-                    result = cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
-                    st.session_state.processed_image = result
+                    run_operation('otsu_threshold')
                     st.success("✅ Otsu threshold applied!")
                     st.rerun()
                 except Exception as e:
@@ -47,16 +40,12 @@ def render_segmentation():
     else:  # Adaptive Threshold
         block_size = st.slider("Block Size", 3, 51, 11, 2, key="seg_block_size")
         C = st.slider("Constant C", -10, 10, 2, key="seg_c")
+        live_preview('adaptive_threshold', "seg_adaptive", block_size=block_size, C=C)
         
         if st.button("🎯 Segment", type="primary", use_container_width=True, key="apply_adaptive"):
             with st.spinner("Segmenting with adaptive threshold..."):
                 try:
-                    st.session_state.history.append(st.session_state.processed_image.copy())
-                    gray = cv2.cvtColor(st.session_state.processed_image, cv2.COLOR_BGR2GRAY)
-                    thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                                   cv2.THRESH_BINARY, block_size, C)
-                    result = cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
-                    st.session_state.processed_image = result
+                    run_operation('adaptive_threshold', block_size=block_size, C=C)
                     st.success("✅ Adaptive threshold applied!")
                     st.rerun()
                 except Exception as e:
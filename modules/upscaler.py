@@ -2,38 +2,23 @@
 Image Upscaler Module - FIXED
 """
 
+import os
+import tempfile
+from functools import partial
 import streamlit as st
-import cv2
-import numpy as np
+from config import UPSCALE_STREAM_PIXELS
+from ops.enhance import upscale_to_file
+from utils.session import get_proxy, run_operation
 
-def upscale_image(image, scale_factor, method='Bicubic', sharpen=True):
-    """Upscale image"""
-    interpolation_map = {
-        'Nearest Neighbor': cv2.INTER_NEAREST,
-        'Bilinear': cv2.INTER_LINEAR,
-        'Bicubic': cv2.INTER_CUBIC,
-        'Lanczos': cv2.INTER_LANCZOS4
-    }
-    
-    interpolation = interpolation_map.get(method, cv2.INTER_CUBIC)
-    height, width = image.shape[:2]
-    new_width = int(width * scale_factor)
-    new_height = int(height * scale_factor)
-    
-    upscaled = cv2.resize(image, (new_width, new_height), interpolation=interpolation)
-    
-    if sharpen:
-        kernel = np.array([[-1,-1,-1], [-1, 9,-1], [-1,-1,-1]])
-        upscaled = cv2.filter2D(upscaled, -1, kernel)
-        upscaled = np.clip(upscaled, 0, 255).astype(np.uint8)
-    
-    return upscaled
+def _open_file(path):
+    """Download callback for the streamed PNG (Streamlit reads the file object itself)"""
+    return open(path, 'rb')
 
 def render_upscaler():
     """Render Upscaler UI"""
     st.markdown("### ⚙️ Settings")
     
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         scale_factor = st.selectbox("Scale Factor", [1.5, 2.0, 3.0, 4.0], index=1, key="scale_factor")
@@ -41,15 +26,46 @@ def render_upscaler():
     with col2:
         method = st.selectbox("Method", ['Nearest Neighbor', 'Bilinear', 'Bicubic', 'Lanczos'], index=2, key="upscale_method")
     
+    with col3:
+        steps = st.selectbox("Steps", [1, 2, 3], index=0, key="upscale_steps",
+                             help="Progressive upscaling in several smaller steps")
+    
     sharpen = st.checkbox("Apply Post-Sharpening", value=True, key="sharpen_check")
     
+    # Stream very large targets to disk instead of holding them in the session
+    proxy = get_proxy()
+    height, width = (proxy.full_image if proxy is not None else st.session_state.processed_image).shape[:2]
+    target_pixels = int(width * scale_factor) * int(height * scale_factor)
+    
     if st.button("🔍 Upscale Image", type="primary", use_container_width=True, key="apply_upscale"):
         with st.spinner(f"Upscaling to {scale_factor}×..."):
             try:
-                st.session_state.history.append(st.session_state.processed_image.copy())
-                upscaled = upscale_image(st.session_state.processed_image, scale_factor, method, sharpen)
-                st.session_state.processed_image = upscaled
+                upscaled = run_operation('upscale', scale_factor=scale_factor, method=method, sharpen=sharpen,
+                                         steps=steps)
                 st.success(f"✅ Image upscaled to {upscaled.shape[1]} × {upscaled.shape[0]}!")
                 st.rerun()
             except Exception as e:
                 st.error(f"Error: {str(e)}")
+    
+    if target_pixels > UPSCALE_STREAM_PIXELS:
+        st.warning(f"Target is {target_pixels / 1e6:.0f} MP; write it straight to a PNG file instead.")
+        if st.button("💾 Upscale to PNG File", use_container_width=True, key="upscale_to_file"):
+            with st.spinner("Upscaling band by band..."):
+                try:
+                    previous = st.session_state.get('upscale_file')
+                    if previous and os.path.exists(previous):
+                        os.remove(previous)
+                    fd, path = tempfile.mkstemp(suffix=".png", prefix="visionlab_upscale_")
+                    os.close(fd)
+                    # In proxy mode, upscale the full-resolution render
+                    source = proxy.render() if proxy is not None else st.session_state.processed_image
+                    upscale_to_file(source, path, scale_factor, method, sharpen, steps)
+                    st.session_state.upscale_file = path
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
+        
+        path = st.session_state.get('upscale_file')
+        if path and os.path.exists(path):
+            st.download_button(f"📥 Download upscaled PNG ({os.path.getsize(path) / 1e6:.1f} MB)",
+                               partial(_open_file, path), "upscaled.png", "image/png",
+                               on_click="ignore", use_container_width=True, key="download_upscale_file")
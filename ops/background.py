@@ -0,0 +1,275 @@
+"""
+Background Operations - GrabCut, threshold, color range and AI removal
+"""
+
+import threading
+import cv2
+import numpy as np
+from config import MATTE_COARSE_SIDE, MATTE_BAND, MATTE_EPS, REMBG_MODEL, REMBG_THREADS, TILE_SIZE
+from ops.guided import guided_filter
+from ops.mask import composite, to_rgba
+from ops.morphology import dilate, erode, morphology_ex
+from ops.planes import plane
+from ops.proxy import downscale
+from ops.registry import register_op, Param
+from ops.tiling import tile_bounds
+
+
+def multires_mask(image, segment, refine=None, max_side=MATTE_COARSE_SIDE, band=MATTE_BAND):
+    """Coarse-to-fine 0/1 mask
+
+    segment(small) -> (mask, state) runs on a downscaled copy. The mask is
+    upsampled, and only an uncertain band around its boundary is revisited
+    at full resolution: refine(pixels, state, ys, xs) -> 0/1 relabels band
+    pixels, then a guided filter on the full-resolution image snaps the
+    band to real edges. The filter only runs on tiles holding band pixels.
+    """
+    small, factor = downscale(image, max_side)
+    coarse, state = segment(small)
+    if factor >= 1.0:
+        return coarse
+    
+    height, width = image.shape[:2]
+    soft = cv2.resize(coarse.astype(np.float32), (width, height), interpolation=cv2.INTER_LINEAR)
+    binary = (soft > 0.5).astype(np.uint8)
+    
+    # Uncertain band: within band coarse pixels of the upsampled boundary
+    radius = max(1, int(np.ceil(band / factor)))
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * radius + 1, 2 * radius + 1))
+    uncertain = dilate(binary, kernel) != erode(binary, kernel)
+    ys, xs = np.nonzero(uncertain)
+    if refine is not None and len(ys):
+        soft[ys, xs] = refine(image[ys, xs], state, ys, xs)
+    
+    # Edge-aware upsampling guided by the full-resolution luminance, per tile
+    # padded by the filter's two box passes so band pixels match a full-frame run
+    guide = plane(image, 'gray')
+    halo = 2 * radius
+    for top, bottom in tile_bounds(height, TILE_SIZE):
+        for left, right in tile_bounds(width, TILE_SIZE):
+            band_pixels = uncertain[top:bottom, left:right]
+            if not band_pixels.any():
+                continue
+            y0, y1 = max(0, top - halo), min(height, bottom + halo)
+            x0, x1 = max(0, left - halo), min(width, right + halo)
+            alpha = guided_filter(guide[y0:y1, x0:x1], soft[y0:y1, x0:x1], radius, MATTE_EPS)
+            alpha = alpha[top - y0:bottom - y0, left - x0:right - x0]
+            binary[top:bottom, left:right][band_pixels] = alpha[band_pixels] > 0.5
+    return binary
+
+
+def grabcut_rect(height, width):
+    """Rectangle around the subject (center 80% of the image)"""
+    margin_h = int(height * 0.1)
+    margin_w = int(width * 0.1)
+    return (margin_w, margin_h, width - 2*margin_w, height - 2*margin_h)
+
+
+def grabcut_mask(image, iterations=5):
+    """GrabCut 0/1 mask plus the learned (background, foreground) color models"""
+    # Create mask
+    mask = np.zeros(image.shape[:2], np.uint8)
+    rect = grabcut_rect(*image.shape[:2])
+    
+    # Initialize background and foreground models
+    bgd_model = np.zeros((1, 65), np.float64)
+    fgd_model = np.zeros((1, 65), np.float64)
+    
+    # Apply GrabCut
+    cv2.grabCut(image, mask, rect, bgd_model, fgd_model, iterations, cv2.GC_INIT_WITH_RECT)
+    
+    # Create binary mask
+    mask2 = np.where((mask == 2) | (mask == 0), 0, 1).astype('uint8')
+    return mask2, (bgd_model, fgd_model)
+
+
+def gmm_likelihood(model, pixels):
+    """Likelihood (up to a constant) of BGR pixels under a cv2.grabCut 5-component GMM"""
+    model = model.ravel()
+    weights, means, covs = model[:5], model[5:20].reshape(5, 3), model[20:65].reshape(5, 3, 3)
+    pixels = pixels.astype(np.float64)
+    total = np.zeros(len(pixels))
+    for weight, mean, cov in zip(weights, means, covs):
+        if weight <= 0:
+            continue
+        diff = pixels - mean
+        distance = np.einsum('ni,ij,nj->n', diff, np.linalg.inv(cov), diff)
+        total += weight / np.sqrt(np.linalg.det(cov)) * np.exp(-0.5 * distance)
+    return total
+
+
+def refine_grabcut(pixels, models, ys, xs, rect):
+    """Relabel band pixels with GrabCut's color models (outside the rectangle stays background)"""
+    bgd_model, fgd_model = models
+    foreground = gmm_likelihood(fgd_model, pixels) > gmm_likelihood(bgd_model, pixels)
+    x, y, w, h = rect
+    inside = (xs >= x) & (xs < x + w) & (ys >= y) & (ys < y + h)
+    return (foreground & inside).astype(np.float32)
+
+
+def remove_background_grabcut(image, iterations=5, multires=True):
+    """Remove background using GrabCut algorithm (coarse-to-fine by default)"""
+    if multires:
+        rect = grabcut_rect(*image.shape[:2])
+        mask2 = multires_mask(image, lambda small: grabcut_mask(small, iterations),
+                              lambda pixels, models, ys, xs: refine_grabcut(pixels, models, ys, xs, rect))
+    else:
+        mask2, _ = grabcut_mask(image, iterations)
+    
+    return composite(image, mask2), mask2
+
+
+def clean_mask(mask):
+    """Close then open with a 5x5 kernel"""
+    kernel = np.ones((5, 5), np.uint8)
+    return morphology_ex(morphology_ex(mask, 'Closing', kernel), 'Opening', kernel)
+
+
+def threshold_mask(image, threshold=240):
+    """0/1 mask keeping pixels darker than threshold"""
+    # Create mask (invert so dark areas are kept)
+    _, mask = cv2.threshold(plane(image, 'gray'), threshold, 255, cv2.THRESH_BINARY_INV)
+    
+    # Apply morphological operations to clean up
+    return (clean_mask(mask) / 255).astype(np.uint8)
+
+
+def remove_background_threshold(image, threshold=240, multires=False):
+    """Remove white/light backgrounds using simple thresholding"""
+    if multires:
+        def refine(pixels, state, ys, xs):
+            gray = cv2.cvtColor(pixels[:, None], cv2.COLOR_BGR2GRAY).ravel()
+            return (gray <= threshold).astype(np.float32)
+        mask = multires_mask(image, lambda small: (threshold_mask(small, threshold), None), refine)
+    else:
+        mask = threshold_mask(image, threshold)
+    
+    return composite(image, mask), mask  # background becomes black
+
+
+def color_range_mask(image, lower_color, upper_color):
+    """0/1 mask keeping pixels outside an HSV range"""
+    # Create mask in HSV for better color detection
+    mask = cv2.inRange(plane(image, 'hsv'), np.asarray(lower_color), np.asarray(upper_color))
+    
+    # Invert mask (we want to keep the subject, remove background)
+    mask = cv2.bitwise_not(mask)
+    
+    # Apply morphological operations
+    return (clean_mask(mask) / 255).astype(np.uint8)
+
+
+def remove_background_color_range(image, lower_color, upper_color, multires=False):
+    """Remove background based on color range"""
+    if multires:
+        def refine(pixels, state, ys, xs):
+            hsv = cv2.cvtColor(pixels[:, None], cv2.COLOR_BGR2HSV)
+            inside = cv2.inRange(hsv, np.asarray(lower_color), np.asarray(upper_color)).ravel()
+            return (inside == 0).astype(np.float32)
+        mask = multires_mask(image, lambda small: (color_range_mask(small, lower_color, upper_color), None),
+                             refine)
+    else:
+        mask = color_range_mask(image, lower_color, upper_color)
+    
+    return composite(image, mask), mask
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(model_name=REMBG_MODEL, threads=REMBG_THREADS):
+    """Process-wide rembg session for a model, created on first use
+
+    The ONNX model is loaded once per process and shared by every call;
+    ONNX Runtime sessions are safe to run from several threads.
+    """
+    key = (model_name, threads)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            import onnxruntime as ort
+            from rembg.sessions import sessions_class
+            from rembg.sessions.u2net import U2netSession
+            
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = int(threads)
+            session_class = next((c for c in sessions_class if c.name() == model_name), U2netSession)
+            session = _sessions[key] = session_class(model_name, options)
+    return session
+
+
+def warmup_session(model_name=REMBG_MODEL, threads=REMBG_THREADS):
+    """Load the model and run one tiny inference in the background"""
+    def warm():
+        try:
+            ai_mask(np.zeros((32, 32, 3), np.uint8), model_name, threads)
+        except Exception:
+            pass  # rembg not installed or model unavailable; the first real call will report it
+    thread = threading.Thread(target=warm, name="rembg-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def ai_mask(image, model_name=REMBG_MODEL, threads=REMBG_THREADS):
+    """Soft foreground mask (uint8, 0-255) from the pooled rembg session"""
+    from PIL import Image
+    
+    pil_img = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    masks = get_session(model_name, threads).predict(pil_img)
+    return np.asarray(masks[0], dtype=np.uint8)
+
+
+def apply_soft_mask(image, mask):
+    """Scale colors by alpha so fully transparent pixels become black"""
+    return cv2.multiply(image, cv2.merge([mask] * image.shape[2]), scale=1 / 255)
+
+
+def remove_background_ai(image, model_name=REMBG_MODEL):
+    """Remove background with rembg (transparent areas become black)"""
+    return apply_soft_mask(image, ai_mask(image, model_name))
+
+
+def add_transparent_background(image, mask, feather=0):
+    """Add alpha channel for transparency (mask: 0/1 array or PackedMask)"""
+    return to_rgba(image, mask, feather)
+
+
+def replace_background(image, mask, new_bg, feather=0):
+    """Replace background with a BGR color or a background image (blended in one pass)"""
+    return composite(image, mask, new_bg, feather)
+
+
+@register_op('remove_bg_grabcut', params=[
+    Param('iterations', int, 5, 1, 10),
+    Param('multires', bool, True),
+], label='GrabCut (Auto)', category='Background Removal', channels=(3,), checkpoint=True)
+def grabcut_op(image, iterations=5, multires=True):
+    """GrabCut removal (image only)"""
+    return remove_background_grabcut(image, iterations, multires)[0]
+
+
+@register_op('remove_bg_threshold', params=[
+    Param('threshold', int, 240, 0, 255),
+    Param('multires', bool, False),
+], label='Threshold (White BG)', category='Background Removal', channels=(3,))
+def threshold_op(image, threshold=240, multires=False):
+    """Threshold removal (image only)"""
+    return remove_background_threshold(image, threshold, multires)[0]
+
+
+@register_op('remove_bg_color_range', params=[
+    Param('lower_color', tuple, (40, 40, 40)),
+    Param('upper_color', tuple, (80, 255, 255)),
+    Param('multires', bool, False),
+], label='Color Range', category='Background Removal', channels=(3,))
+def color_range_op(image, lower_color=(40, 40, 40), upper_color=(80, 255, 255), multires=False):
+    """Color range removal (image only)"""
+    return remove_background_color_range(image, lower_color, upper_color, multires)[0]
+
+
+@register_op('remove_bg_ai', label='AI-Powered (rembg)', category='Background Removal', channels=(3,),
+             checkpoint=True)
+def ai_op(image):
+    """AI removal (pooled model session)"""
+    return remove_background_ai(image)
@@ -0,0 +1,41 @@
+"""
+Basic Operations - fills, flips and other sanity-check transforms
+"""
+
+import cv2
+import numpy as np
+from ops.registry import register_op
+from ops.lut import IDENTITY, apply_lut, channel_lut
+
+
+def make_red_lut():
+    """Blue = 0, Green = 0, Red = 255"""
+    return channel_lut(0, 0, 255)
+
+
+def constant_lut(value):
+    return np.full_like(IDENTITY, value)
+
+
+@register_op('make_red', label='Make Red', category='Test Simple', channels=(3,), lut=make_red_lut, color=True)
+def make_red(image):
+    """Make the entire image red"""
+    return apply_lut(image, make_red_lut())
+
+
+@register_op('make_black', label='Make Black', category='Test Simple', lut=lambda: constant_lut(0), color=True)
+def make_black(image):
+    """Make the entire image black"""
+    return np.zeros_like(image)
+
+
+@register_op('make_white', label='Make White', category='Test Simple', lut=lambda: constant_lut(255), color=True)
+def make_white(image):
+    """Make the entire image white"""
+    return np.full_like(image, 255)
+
+
+@register_op('flip_vertical', label='Flip Upside Down', category='Test Simple')
+def flip_vertical(image):
+    """Flip image upside down"""
+    return cv2.flip(image, 0)
@@ -0,0 +1,251 @@
+"""
+Batch Engine - staged decode, compute and encode lanes over many images
+"""
+
+import os
+import queue
+import threading
+import time
+import multiprocessing
+from functools import partial
+import cv2
+import numpy as np
+from ops.pipeline import Pipeline
+
+STAGES = ('decode', 'compute', 'encode')
+
+LANE_POLL_SECONDS = 0.5  # how often a blocked queue call checks for crashed workers or a stop
+
+OUTPUT_FORMATS = {
+    'PNG': '.png',
+    'JPEG': '.jpg',
+    'WEBP': '.webp'
+}
+
+
+class BatchResult:
+    """Outcome of processing a single file"""
+
+    def __init__(self, index, name, data=None, error=None, timings=None):
+        self.index = index
+        self.name = name
+        self.data = data
+        self.error = error
+        self.timings = timings or {}
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchReport:
+    """Throughput, per-stage time and failures for a batch run"""
+
+    def __init__(self):
+        self.processed = 0
+        self.failures = []
+        self.stage_times = {stage: 0.0 for stage in STAGES}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, result):
+        """Record a finished file"""
+        self.processed += 1
+        for stage, seconds in result.timings.items():
+            self.stage_times[stage] += seconds
+        if not result.ok:
+            self.failures.append((result.name, result.error))
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def succeeded(self):
+        return self.processed - len(self.failures)
+
+    @property
+    def throughput(self):
+        """Images per second (wall clock)"""
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def decode_image(data):
+    """Decode encoded image bytes to a BGR array"""
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Unsupported or corrupt image")
+    return image
+
+
+def encode_image(image, output_format='PNG', quality=95):
+    """Encode a BGR array to bytes"""
+    if output_format == 'JPEG':
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+    elif output_format == 'WEBP':
+        params = [int(cv2.IMWRITE_WEBP_QUALITY), quality]
+    else:
+        params = []
+    ok, buffer = cv2.imencode(OUTPUT_FORMATS[output_format], image, params)
+    if not ok:
+        raise ValueError(f"Could not encode {output_format}")
+    return buffer.tobytes()
+
+
+def output_name(name, output_format):
+    """Output file name with the extension of the chosen format"""
+    return os.path.splitext(name)[0] + OUTPUT_FORMATS[output_format]
+
+
+def _run_stage(stage, func, source, sink):
+    """Apply func to the data of each item from source and pass it to sink
+
+    Failed items flow through untouched so every file reaches the output;
+    None marks the end of the stream and is forwarded.
+    """
+    while True:
+        item = source.get()
+        if item is None:
+            sink.put(None)
+            return
+        if item.ok:
+            start = time.perf_counter()
+            try:
+                item.data = func(item.data)
+            except Exception as e:
+                item.data = None
+                item.error = f"{stage}: {e}"
+            item.timings[stage] = time.perf_counter() - start
+        sink.put(item)
+
+
+def run_lane(inbox, outbox, steps, output_format='PNG', quality=95, bake_color=False, queue_size=2):
+    """Worker process: decode, compute and encode stages joined by bounded queues
+
+    Decode and encode run in threads (OpenCV releases the GIL), so the next
+    file decodes and the previous one encodes while this one computes.
+    """
+    pipeline = Pipeline(steps)
+    if any(name == 'remove_bg_ai' for name, _ in pipeline.steps):
+        # Load the model while the first file decodes; every file then reuses the session
+        from ops.background import warmup_session
+        warmup_session()
+    decoded = queue.Queue(queue_size)
+    computed = queue.Queue(queue_size)
+    compute = partial(pipeline.run, tiled=True, workers=1, bake_color=bake_color)
+    encode = partial(encode_image, output_format=output_format, quality=quality)
+    threads = [threading.Thread(target=_run_stage, args=('decode', decode_image, inbox, decoded), daemon=True),
+               threading.Thread(target=_run_stage, args=('encode', encode, computed, outbox), daemon=True)]
+    for thread in threads:
+        thread.start()
+    _run_stage('compute', compute, decoded, computed)
+    for thread in threads:
+        thread.join()
+
+
+class BatchEngine:
+    """Runs a pipeline over many encoded images on worker processes
+
+    Each worker is a lane of decode -> compute -> encode stages (run_lane).
+    Files reach the lanes through one bounded inbox and come back encoded
+    through a bounded outbox, so decoded pixels never cross processes.
+    """
+
+    def __init__(self, pipeline, output_format='PNG', quality=95, workers=None, queue_size=2,
+                 bake_color=False):
+        if isinstance(pipeline, Pipeline):
+            pipeline = pipeline.to_list()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}'")
+        self.steps = pipeline
+        self.output_format = output_format
+        self.quality = quality
+        self.workers = workers or os.cpu_count() or 1
+        # Queue depth between stages: bounds how many inputs/outputs are held at once
+        self.queue_size = max(1, queue_size)
+        # Color op runs bake into a 3D LUT once per worker and are reused for every file
+        self.bake_color = bake_color
+        self.report = BatchReport()
+
+    def run(self, files):
+        """Yield a BatchResult per file as it finishes
+
+        files is an iterable of (name, bytes) pairs and is consumed lazily:
+        at most workers * queue_size files wait in each of the inbox and
+        outbox, plus queue_size per stage queue inside each lane.
+        """
+        self.report = BatchReport()
+        files = iter(files)  # shared by the feeder and, after a crash, _fail_remaining
+        context = multiprocessing.get_context('spawn')
+        inbox = context.Queue(self.workers * self.queue_size)
+        outbox = context.Queue(self.workers * self.queue_size)
+        lanes = [context.Process(target=run_lane, daemon=True,
+                                 args=(inbox, outbox, self.steps, self.output_format, self.quality,
+                                       self.bake_color, self.queue_size))
+                 for _ in range(self.workers)]
+        for lane in lanes:
+            lane.start()
+        
+        in_flight = {}  # index -> name, for files sent but not yet returned
+        stop = threading.Event()
+        feeder = threading.Thread(target=self._feed, args=(files, inbox, in_flight, stop), daemon=True)
+        feeder.start()
+        
+        try:
+            finished = 0
+            while finished < len(lanes):
+                try:
+                    result = outbox.get(timeout=LANE_POLL_SECONDS)
+                except queue.Empty:
+                    crashed = [lane.exitcode for lane in lanes if lane.exitcode not in (None, 0)]
+                    if crashed:
+                        yield from self._fail_remaining(f"worker exited with code {crashed[0]}", files,
+                                                        in_flight, stop, feeder)
+                        return
+                    continue
+                if result is None:
+                    finished += 1
+                    continue
+                in_flight.pop(result.index, None)
+                if result.ok:
+                    result.name = output_name(result.name, self.output_format)
+                self.report.add(result)
+                yield result
+        finally:
+            stop.set()
+            for lane in lanes:
+                if lane.is_alive():
+                    lane.terminate()
+                lane.join()
+            for channel in (inbox, outbox):
+                channel.cancel_join_thread()
+                channel.close()
+
+    def _feed(self, files, inbox, in_flight, stop):
+        """Send files to the lanes (blocking while the inbox is full), then one end marker per lane"""
+        for index, (name, data) in enumerate(files):
+            in_flight[index] = name
+            if not self._put(inbox, BatchResult(index, name, data), stop):
+                return
+        for _ in range(self.workers):
+            if not self._put(inbox, None, stop):
+                return
+
+    @staticmethod
+    def _put(channel, item, stop):
+        while not stop.is_set():
+            try:
+                channel.put(item, timeout=LANE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail_remaining(self, error, files, in_flight, stop, feeder):
+        """After a lane crash: report every unfinished and unsent file as failed"""
+        stop.set()
+        feeder.join()
+        failed = [BatchResult(index, name, error=f"worker: {error}") for index, name in sorted(in_flight.items())]
+        # The feeder stopped at the crash; files it never reached are consumed here
+        next_index = max(in_flight, default=-1) + 1
+        failed += [BatchResult(next_index + i, name, error=f"worker: {error}") for i, (name, _) in enumerate(files)]
+        for result in failed:
+            self.report.add(result)
+            yield result
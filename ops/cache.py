@@ -0,0 +1,109 @@
+"""
+Version Cache - per-image version ids and small LRU caches
+"""
+
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+
+_versions = {}
+_counter = itertools.count(1)
+
+
+def image_version(image):
+    """Stable version id for an image array object
+
+    Session images are never modified in place (every edit produces a new
+    array), so the array object itself identifies a version. Ids are never
+    reused, even when an array is freed and its memory recycled.
+    """
+    key = id(image)
+    entry = _versions.get(key)
+    if entry is not None and entry[0]() is image:
+        return entry[1]
+    version = next(_counter)
+    _versions[key] = (weakref.ref(image, lambda _, key=key: _versions.pop(key, None)), version)
+    return version
+
+
+def owns_data(image):
+    """False for views into another array (e.g. the tiles of a tiled run)
+
+    A view's version lives only as long as the call that made it, so
+    caching results for it would just evict entries for session images.
+    """
+    return image.base is None
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache
+
+    Bounded by entry count, and optionally by maxbytes as measured by
+    sizeof(value); a value larger than maxbytes on its own is not stored.
+    """
+
+    def __init__(self, maxsize=32, on_evict=None, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        # Called with each value dropped to make room (e.g. to delete a temp file)
+        self.on_evict = on_evict
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or (lambda value: value.nbytes)
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        evicted = []
+        with self._lock:
+            size = self.sizeof(value) if self.maxbytes is not None else 0
+            if self.maxbytes is not None and size > self.maxbytes:
+                return value
+            if key in self._data:
+                self._bytes -= self._sizes.pop(key)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                old_key, old = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                evicted.append(old)
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key, _missing)
+        if value is _missing:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._data.values())
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+_missing = object()
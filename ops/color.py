@@ -0,0 +1,74 @@
+"""
+Color Operations - HSV adjustment, white balance and equalization
+"""
+
+import cv2
+import numpy as np
+from ops.registry import register_op, Param
+from ops.histogram import equalize_lut, histograms, levels_lut
+from ops.lut import apply_lut, channel_lut, gamma_lut
+from ops.planes import plane
+
+
+@register_op('adjust_hsv', params=[
+    Param('hue_shift', int, 0, -180, 180),
+    Param('saturation_scale', float, 1.0, 0.0, 2.0),
+    Param('value_scale', float, 1.0, 0.0, 2.0),
+], label='HSV Adjustment', category='Color Enhancement', channels=(3,), halo=0, color=True)
+def adjust_hsv(image, hue_shift=0, saturation_scale=1.0, value_scale=1.0):
+    """Adjust HSV values"""
+    hsv = apply_lut(plane(image, 'hsv'), hsv_lut(hue_shift, saturation_scale, value_scale))
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+
+
+def hsv_lut(hue_shift=0, saturation_scale=1.0, value_scale=1.0):
+    """Per-channel LUT applied in HSV space (uint8, no float copy of the image)"""
+    values = np.arange(256, dtype=np.float32)
+    hue = ((values + hue_shift) % 180).astype(np.uint8)
+    saturation = np.clip(values * saturation_scale, 0, 255).astype(np.uint8)
+    value = np.clip(values * value_scale, 0, 255).astype(np.uint8)
+    return channel_lut(hue, saturation, value)
+
+
+@register_op('gamma', params=[
+    Param('gamma', float, 1.0, 0.1, 5.0),
+], label='Gamma Correction', category='Color Enhancement', lut=gamma_lut, color=True)
+def gamma_correction(image, gamma=1.0):
+    """Gamma correction via a 256-entry LUT"""
+    return apply_lut(image, gamma_lut(gamma))
+
+
+@register_op('white_balance', label='Auto White Balance', category='Color Enhancement', channels=(3,))
+def auto_white_balance(image):
+    """Auto white balance (gray world gains applied as one per-channel LUT)"""
+    return apply_lut(image, white_balance_lut(*cv2.mean(image)[:3]))
+
+
+def white_balance_lut(avg_b, avg_g, avg_r):
+    """Per-channel gain LUT that maps the channel means to their average"""
+    gray = (avg_b + avg_g + avg_r) / 3
+    values = np.arange(256, dtype=np.float32)
+    gains = [gray / avg if avg > 0 else 1.0 for avg in (avg_b, avg_g, avg_r)]
+    return channel_lut(*[np.clip(values * gain, 0, 255).astype(np.uint8) for gain in gains])
+
+
+@register_op('equalize_hist', label='Histogram Equalization', category='Histogram Analyzer')
+def equalize_histogram(image):
+    """Equalize luminance (YUV) or grayscale histogram"""
+    if len(image.shape) == 3:
+        yuv = plane(image, 'yuv')
+        y, u, v = cv2.split(yuv)
+        return cv2.cvtColor(cv2.merge([cv2.equalizeHist(y), u, v]), cv2.COLOR_YUV2BGR)
+    # Grayscale: reuse the cached histogram instead of another counting pass
+    return apply_lut(image, equalize_lut(histograms(image).luminance))
+
+
+@register_op('auto_levels', params=[
+    Param('clip_percent', float, 0.5, 0.0, 10.0),
+], label='Auto Levels', category='Histogram Analyzer')
+def auto_levels(image, clip_percent=0.5):
+    """Stretch each channel so clip_percent of pixels saturate at each end"""
+    hist = histograms(image)
+    luts = [levels_lut(hist.percentile(clip_percent, c), hist.percentile(100 - clip_percent, c))
+            for c in range(len(hist.channels))]
+    return apply_lut(image, luts[0] if len(luts) == 1 else channel_lut(*luts))
@@ -0,0 +1,196 @@
+"""
+3D Color LUT - lattice LUTs (.cube) and full 24-bit color tables applied with one gather per pixel
+"""
+
+import cv2
+import numpy as np
+from ops.cache import LRUCache
+
+DEFAULT_SIZE = 33
+CHUNK_PIXELS = 1 << 20
+LEVELS = 256
+
+_baked = LRUCache(16)
+_tables = LRUCache(2)  # 64 MB each
+
+
+class ColorTable:
+    """Output color of every 24-bit BGR input, packed as BGRA uint32 in lattice order (b, g, r)"""
+
+    def __init__(self, colors):
+        colors = np.ascontiguousarray(colors, dtype=np.uint8).reshape(LEVELS * 16, LEVELS * 16, 3)
+        self.packed = cv2.cvtColor(colors, cv2.COLOR_BGR2BGRA).view(np.uint32).ravel()
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    @classmethod
+    def from_function(cls, func):
+        """Exact table of a per-pixel BGR -> BGR function, evaluated on every color once"""
+        colors = lattice(LEVELS).reshape(LEVELS * 16, LEVELS * 16, 3)
+        result = func(colors)
+        if result.shape != colors.shape:
+            raise ValueError("Only per-pixel BGR -> BGR operations can be baked")
+        return cls(result)
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Table of a pipeline of per-pixel ops (cached per step list)"""
+        return _tables.get_or_compute(repr(pipeline.to_list()), lambda: cls.from_function(pipeline.run))
+
+    def apply(self, image):
+        """Map a uint8 BGR image through the table, in row blocks"""
+        if len(image.shape) != 3 or image.shape[2] != 3:
+            raise ValueError("3D LUTs need a 3-channel image")
+        height, width = image.shape[:2]
+        output = np.empty_like(image)
+        rows = max(1, CHUNK_PIXELS // width)
+        for top in range(0, height, rows):
+            block = image[top:top + rows]
+            # RGB2BGRA swaps b and r, so each packed pixel reads b << 16 | g << 8 | r: its table index
+            keys = cv2.cvtColor(block, cv2.COLOR_RGB2BGRA).view(np.uint32)[..., 0]
+            keys &= 0xFFFFFF
+            mapped = self.packed.take(keys).view(np.uint8).reshape(block.shape[0], width, 4)
+            output[top:top + rows] = cv2.cvtColor(mapped, cv2.COLOR_BGRA2BGR)
+        return output
+
+
+class ColorLUT:
+    """size^3 lattice of BGR outputs (float32, 0-255) indexed [b, g, r]"""
+
+    def __init__(self, table, title=None):
+        table = np.asarray(table, dtype=np.float32)
+        if table.ndim != 4 or table.shape[3] != 3 or len(set(table.shape[:3])) != 1:
+            raise ValueError(f"Expected a (N, N, N, 3) table, got {table.shape}")
+        self.table = table
+        self.size = table.shape[0]
+        self.title = title
+        self._expanded = None
+        
+        # Per input level: lower lattice node and fractional position
+        position = np.arange(LEVELS, dtype=np.float32) * (self.size - 1) / 255.0
+        self._index = np.minimum(position.astype(np.int32), self.size - 2)
+        self._frac = (position - self._index).astype(np.float32)
+
+    @classmethod
+    def identity(cls, size=DEFAULT_SIZE):
+        return cls(lattice(size).reshape(size, size, size, 3).astype(np.float32))
+
+    @classmethod
+    def bake(cls, func, size=DEFAULT_SIZE, title=None):
+        """Sample a per-pixel BGR -> BGR function on the lattice"""
+        grid = lattice(size).reshape(size * size, size, 3)
+        result = func(grid)
+        if result.shape != grid.shape:
+            raise ValueError("Only per-pixel BGR -> BGR operations can be baked")
+        return cls(result.reshape(size, size, size, 3), title)
+
+    @classmethod
+    def from_pipeline(cls, pipeline, size=DEFAULT_SIZE):
+        """Bake a pipeline of per-pixel ops (cached per step list)"""
+        key = (repr(pipeline.to_list()), size)
+        return _baked.get_or_compute(key, lambda: cls.bake(pipeline.run, size))
+
+    def expanded(self):
+        """Trilinear interpolation of the lattice at every 24-bit color, as a ColorTable (built once)
+
+        Trilinear interpolation is separable: the lattice is interpolated
+        along r, then g, then one b level at a time.
+        """
+        if self._expanded is None:
+            index, frac = self._index, self._frac
+            table = lerp(self.table[:, :, index], self.table[:, :, index + 1], frac[:, None])
+            table = lerp(table[:, index], table[:, index + 1], frac[:, None, None])
+            colors = np.empty((LEVELS, LEVELS, LEVELS, 3), np.uint8)
+            for b in range(LEVELS):
+                level = lerp(table[index[b]], table[index[b] + 1], frac[b])
+                np.clip(level + 0.5, 0, 255, out=level)
+                colors[b] = level
+            self._expanded = ColorTable(colors)
+        return self._expanded
+
+    def apply(self, image):
+        """Map a uint8 BGR image through the LUT (one table gather per pixel)"""
+        return self.expanded().apply(image)
+
+    def then(self, other):
+        """LUT equivalent to applying self, then other"""
+        flat = np.clip(self.table + 0.5, 0, 255).astype(np.uint8).reshape(self.size ** 2, self.size, 3)
+        return ColorLUT(other.apply(flat).reshape(self.table.shape).astype(np.float32))
+
+    def to_cube(self, title=None):
+        """Serialize as an Adobe/Resolve .cube file (RGB, red varies fastest)"""
+        lines = []
+        if title or self.title:
+            lines.append(f'TITLE "{title or self.title}"')
+        lines.append(f"LUT_3D_SIZE {self.size}")
+        lines.append("DOMAIN_MIN 0.0 0.0 0.0")
+        lines.append("DOMAIN_MAX 1.0 1.0 1.0")
+        rgb = self.table[..., ::-1] / 255.0
+        for b in range(self.size):
+            for g in range(self.size):
+                for r in range(self.size):
+                    lines.append("%.6f %.6f %.6f" % tuple(rgb[b, g, r]))
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def from_cube(cls, text):
+        """Parse a .cube file (3D LUTs only)"""
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        size = None
+        title = None
+        domain_min = np.zeros(3, np.float32)
+        domain_max = np.ones(3, np.float32)
+        values = []
+        
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            keyword = line.split()[0].upper()
+            if keyword == 'TITLE':
+                title = line[5:].strip().strip('"')
+            elif keyword == 'LUT_3D_SIZE':
+                size = int(line.split()[1])
+            elif keyword == 'LUT_1D_SIZE':
+                raise ValueError("1D .cube LUTs are not supported")
+            elif keyword == 'DOMAIN_MIN':
+                domain_min = np.array(line.split()[1:4], np.float32)
+            elif keyword == 'DOMAIN_MAX':
+                domain_max = np.array(line.split()[1:4], np.float32)
+            elif keyword[0].isdigit() or keyword[0] in '-.':
+                values.append(line.split()[:3])
+            # Other keywords (LUT_IN_VIDEO_RANGE...) are ignored
+        
+        if size is None:
+            raise ValueError("Missing LUT_3D_SIZE")
+        if len(values) != size ** 3:
+            raise ValueError(f"Expected {size ** 3} entries, found {len(values)}")
+        
+        rgb = (np.array(values, np.float32) - domain_min) / (domain_max - domain_min)
+        table = rgb.reshape(size, size, size, 3)[..., ::-1] * 255.0
+        return cls(table, title)
+
+
+def apply_color_lut(image, lut, fallback=None):
+    """Apply a ColorLUT or ColorTable to BGR images; other layouts go through fallback(image)"""
+    if fallback is not None and (len(image.shape) != 3 or image.shape[2] != 3):
+        return fallback(image)
+    return lut.apply(image)
+
+
+def lattice(size):
+    """BGR lattice points (size^3, 3) as uint8, b slowest and r fastest"""
+    levels = np.round(np.arange(size) * 255.0 / (size - 1)).astype(np.uint8)
+    b, g, r = np.meshgrid(levels, levels, levels, indexing='ij')
+    return np.stack([b, g, r], axis=-1).reshape(-1, 3)
+
+
+def lerp(a, b, t):
+    """a + (b - a) * t"""
+    b = b - a
+    b *= t
+    b += a
+    return b
@@ -0,0 +1,172 @@
+"""
+Compression Operations - codec round trips, rate-distortion sweeps and target search
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from config import COMPRESSION_MEMORY_MB, COMPRESSION_WORKERS
+from ops.registry import register_op, Param
+from utils.metrics import calculate_metrics_uncached
+
+# format -> (extension, quality flag, lowest level, highest level, lossy)
+CODECS = {
+    'JPEG': ('.jpg', cv2.IMWRITE_JPEG_QUALITY, 1, 100, True),
+    'WEBP': ('.webp', cv2.IMWRITE_WEBP_QUALITY, 1, 100, True),
+    'PNG': ('.png', cv2.IMWRITE_PNG_COMPRESSION, 0, 9, False),
+}
+
+# Peak bytes per pixel of scoring one lossy decode (decode, gray planes, float32 SSIM maps)
+SCORE_BYTES_PER_PIXEL = 36
+
+SWEEP_LEVELS = {
+    'JPEG': (10, 20, 30, 40, 50, 60, 70, 80, 85, 90, 95, 100),
+    'WEBP': (10, 20, 30, 40, 50, 60, 70, 80, 85, 90, 95, 100),
+    'PNG': tuple(range(10)),
+}
+
+
+def encode(image, output_format='JPEG', level=90):
+    """Encode with one codec setting (quality for lossy formats, compression level for PNG)"""
+    extension, flag, _, _, _ = CODECS[output_format]
+    ok, buffer = cv2.imencode(extension, image, [int(flag), int(level)])
+    if not ok:
+        raise ValueError(f"Could not encode image as {output_format}")
+    return buffer
+
+
+def jpeg_encode(image, quality=90):
+    """Encode image as JPEG bytes"""
+    return encode(image, 'JPEG', quality)
+
+
+def jpeg_decode(buffer):
+    """Decode JPEG bytes back to an image array"""
+    return cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)
+
+
+class RDPoint:
+    """One encoding: format, level, size in bytes and quality against the source"""
+
+    def __init__(self, output_format, level, size, psnr=None, ssim=None):
+        self.format = output_format
+        self.level = level
+        self.size = size
+        self.psnr = psnr
+        self.ssim = ssim
+
+    def as_dict(self):
+        return {'format': self.format, 'level': self.level, 'size': self.size,
+                'psnr': self.psnr, 'ssim': self.ssim}
+
+    def __repr__(self):
+        return f"RDPoint({self.format} {self.level}: {self.size} B, PSNR {self.psnr}, SSIM {self.ssim})"
+
+
+def measure(image, output_format, level, metrics=True):
+    """Encode, and optionally decode and score, one setting
+
+    The decode is temporary, so it is scored without the metrics and plane caches.
+    """
+    buffer = encode(image, output_format, level)
+    point = RDPoint(output_format, level, len(buffer))
+    if metrics:
+        scores = calculate_metrics_uncached(image, cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED))
+        point.psnr, point.ssim = scores['PSNR'], scores['SSIM']
+    return point
+
+
+def sweep_workers(image, workers=None):
+    """Threads for a sweep: as requested, but few enough that their buffers fit COMPRESSION_MEMORY_MB"""
+    per_worker = image.shape[0] * image.shape[1] * SCORE_BYTES_PER_PIXEL
+    budget = COMPRESSION_MEMORY_MB * 1024 * 1024 // per_worker
+    return max(1, min(workers or COMPRESSION_WORKERS, budget))
+
+
+def sweep(image, formats=('JPEG', 'WEBP', 'PNG'), levels=None, workers=None):
+    """Rate-distortion curve: every (format, level) measured in parallel
+
+    cv2 encoders and the metric filters release the GIL, so threads scale;
+    the pool is capped by sweep_workers so peak memory stays bounded.
+    """
+    levels = levels or {}
+    settings = [(fmt, level) for fmt in formats for level in levels.get(fmt, SWEEP_LEVELS[fmt])]
+    with ThreadPoolExecutor(max_workers=sweep_workers(image, workers)) as executor:
+        points = list(executor.map(lambda s: measure(image, *s), settings))
+    return sorted(points, key=lambda p: (p.format, p.size))
+
+
+def _meets_floor(point, min_psnr, min_ssim):
+    if min_psnr is not None and (point.psnr is None or point.psnr < min_psnr):
+        return False
+    if min_ssim is not None and (point.ssim is None or point.ssim < min_ssim):
+        return False
+    return True
+
+
+def search(image, output_format='JPEG', target_bytes=None, min_psnr=None, min_ssim=None):
+    """Smallest encoding that fits target_bytes and meets the quality floor
+
+    Binary-searches the quality level, assuming size and quality grow with it.
+    Returns (RDPoint or None if infeasible, number of encodes tried).
+    """
+    _, _, low, high, lossy = CODECS[output_format]
+    if not lossy:
+        raise ValueError(f"{output_format} is lossless; search needs a lossy format")
+    if target_bytes is None and min_psnr is None and min_ssim is None:
+        raise ValueError("Give a target size and/or a quality floor")
+    
+    need_metrics = min_psnr is not None or min_ssim is not None
+    probes = {}
+    
+    def probe(level):
+        if level not in probes:
+            probes[level] = measure(image, output_format, level, metrics=need_metrics)
+        return probes[level]
+    
+    # Lowest level meeting the quality floor
+    floor_level = low
+    if need_metrics:
+        lo, hi = low, high
+        if not _meets_floor(probe(hi), min_psnr, min_ssim):
+            return None, len(probes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _meets_floor(probe(mid), min_psnr, min_ssim):
+                hi = mid
+            else:
+                lo = mid + 1
+        floor_level = lo
+    
+    if target_bytes is None:
+        return probe(floor_level), len(probes)
+    if probe(floor_level).size > target_bytes:
+        return None, len(probes)
+    if need_metrics:
+        # The smallest file meeting the floor also fits the budget
+        return probe(floor_level), len(probes)
+    
+    # Size only: highest level that still fits
+    lo, hi = floor_level, high
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if probe(mid).size <= target_bytes:
+            lo = mid
+        else:
+            hi = mid - 1
+    return probe(lo), len(probes)
+
+
+@register_op('jpeg_compress', params=[
+    Param('quality', int, 90, 1, 100),
+], label='JPEG Compression', category='Image Compression')
+def jpeg_compress(image, quality=90):
+    """Simulate JPEG compression (encode + decode)"""
+    return jpeg_decode(jpeg_encode(image, quality))
+
+
+@register_op('webp_compress', params=[
+    Param('quality', int, 90, 1, 100),
+], label='WebP Compression', category='Image Compression')
+def webp_compress(image, quality=90):
+    """Simulate WebP compression (encode + decode)"""
+    return cv2.imdecode(encode(image, 'WEBP', quality), cv2.IMREAD_UNCHANGED)
@@ -0,0 +1,112 @@
+"""
+Image Decode - decode straight from encoded buffers, reduced-size decode, content-hash cache
+"""
+
+import hashlib
+from io import BytesIO
+import cv2
+import numpy as np
+from PIL import Image
+from config import DECODE_CACHE_SIZE
+from ops.cache import LRUCache
+
+# libjpeg can decode at 1/2, 1/4 and 1/8 scale directly (DCT scaling)
+REDUCTIONS = (8, 4, 2)
+REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+_decoded = LRUCache(DECODE_CACHE_SIZE)
+
+
+def content_hash(data):
+    """Stable key for encoded image bytes"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def image_size(data):
+    """(width, height) read from the file header, without decoding pixels"""
+    with Image.open(BytesIO(data)) as image:
+        return image.size
+
+
+def reduction_for(data, max_side):
+    """Largest decode reduction that still yields at least max_side pixels"""
+    if not max_side:
+        return 1
+    try:
+        longest = max(image_size(data))
+    except Exception:
+        return 1
+    for reduction in REDUCTIONS:
+        if longest // reduction >= max_side:
+            return reduction
+    return 1
+
+
+def to_uint8(image):
+    """Bring 16-bit / float decodes into the uint8 range the ops expect"""
+    if image.dtype == np.uint8:
+        return image
+    if image.dtype == np.uint16:
+        return cv2.convertScaleAbs(image, alpha=1 / 257)
+    return np.clip(image.astype(np.float32) * 255, 0, 255).astype(np.uint8)
+
+
+def drop_alpha(image):
+    """BGR or gray layout the ops accept: alpha is dropped, as cv2.IMREAD_COLOR does"""
+    if image.ndim == 3 and image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    if image.ndim == 3 and image.shape[2] == 2:
+        return np.ascontiguousarray(image[..., 0])
+    return image
+
+
+def decode(data, reduction=1):
+    """Decode encoded bytes to a BGR/gray uint8 array (alpha is dropped)
+
+    reduction > 1 decodes at 1/reduction scale (always BGR), which for JPEG
+    skips most of the IDCT work instead of decoding and then resizing.
+    """
+    buffer = np.frombuffer(data, np.uint8)
+    flags = REDUCED_FLAGS.get(reduction, cv2.IMREAD_UNCHANGED)
+    image = cv2.imdecode(buffer, flags)
+    if image is None:
+        image = _decode_pil(data, reduction)
+    return drop_alpha(to_uint8(image))
+
+
+def _decode_pil(data, reduction=1):
+    """Fallback for formats OpenCV cannot read (uses JPEG draft mode when reducing)"""
+    try:
+        image = Image.open(BytesIO(data))
+        if reduction > 1:
+            image.draft('RGB', (image.width // reduction, image.height // reduction))
+            image = image.convert('RGB')
+        array = np.array(image)  # owned, so derived planes of the upload are cached
+    except Exception as e:
+        raise ValueError(f"Unsupported or corrupt image: {e}")
+    if array.ndim == 3 and array.shape[2] == 3:
+        return cv2.cvtColor(array, cv2.COLOR_RGB2BGR)
+    if array.ndim == 3 and array.shape[2] == 4:
+        return cv2.cvtColor(array, cv2.COLOR_RGBA2BGRA)
+    return array
+
+
+def decode_cached(data, reduction=1, key=None):
+    """Decode with the result cached by content hash (treat it as read-only)"""
+    key = key or content_hash(data)
+    return _decoded.get_or_compute((key, reduction), lambda: decode(data, reduction))
+
+
+def decode_preview(data, max_side, key=None):
+    """Reduced decode, then area-resize so the longest side is at most max_side"""
+    image = decode_cached(data, reduction_for(data, max_side), key)
+    height, width = image.shape[:2]
+    factor = max_side / max(height, width)
+    if factor >= 1.0:
+        return image
+    size = (max(1, int(round(width * factor))), max(1, int(round(height * factor))))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,50 @@
+"""
+Denoising Operations - Gaussian, median, bilateral and Non-Local Means
+"""
+
+import cv2
+from ops.blur import BLUR_ENGINES, blur_halo, gaussian, kernel_sigma
+from ops.registry import register_op, Param
+from ops.smoothing import SMOOTHING_ENGINES, smooth, smoothing_halo
+
+
+@register_op('gaussian_blur', params=[
+    Param('kernel_size', int, 5, 1, 99, odd=True, spatial=True),
+    Param('engine', str, 'auto', choices=BLUR_ENGINES),
+], label='Gaussian Blur', category='Image Denoiser',
+    halo=lambda p: blur_halo(kernel_sigma(p['kernel_size']), p['engine'], p['kernel_size']))
+def gaussian_blur(image, kernel_size=5, engine='auto'):
+    """Gaussian blur with a square kernel (large kernels switch to box/IIR engines)"""
+    return gaussian(image, kernel_sigma(kernel_size), engine, kernel_size)
+
+
+@register_op('median_blur', params=[
+    Param('kernel_size', int, 5, 1, 21, odd=True, spatial=True),
+], label='Median Filter', category='Image Denoiser', halo=lambda p: p['kernel_size'] // 2)
+def median_blur(image, kernel_size=5):
+    """Median filter"""
+    return cv2.medianBlur(image, kernel_size)
+
+
+@register_op('bilateral', params=[
+    Param('d', int, 9, 1, 31, spatial=True),
+    Param('sigma_color', float, 75, 1, 255),
+    Param('sigma_space', float, 75, 1, 255, spatial=True),
+    Param('engine', str, 'exact', choices=list(SMOOTHING_ENGINES)),
+], label='Bilateral Filter', category='Image Denoiser', halo=lambda p: smoothing_halo(p['engine'], p['d']))
+def bilateral_filter(image, d=9, sigma_color=75, sigma_space=75, engine='exact'):
+    """Edge-preserving bilateral filter (exact, or a guided/grid approximation)"""
+    return smooth(image, d, sigma_color, sigma_space, engine)
+
+
+@register_op('nl_means', params=[
+    Param('h', float, 10, 1, 30),
+    Param('template_size', int, 7, 3, 11, odd=True, spatial=True),
+    Param('search_size', int, 21, 11, 31, odd=True, spatial=True),
+], label='Non-Local Means', category='Image Denoiser', checkpoint=True,
+    halo=lambda p: p['template_size'] // 2 + p['search_size'] // 2)
+def nl_means(image, h=10, template_size=7, search_size=21):
+    """Non-Local Means denoising"""
+    if len(image.shape) == 3:
+        return cv2.fastNlMeansDenoisingColored(image, None, h, h, template_size, search_size)
+    return cv2.fastNlMeansDenoising(image, None, h, template_size, search_size)
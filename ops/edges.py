@@ -0,0 +1,97 @@
+"""
+Edge Detection Operations - Canny, Sobel and Laplacian
+"""
+
+import cv2
+import numpy as np
+from ops.cache import LRUCache, image_version, owns_data
+from ops.registry import register_op, Param
+from ops.planes import plane
+
+# (image version, ksize, border) -> (dx, dy)
+_gradients = LRUCache(4)
+
+
+def to_gray(image):
+    """Grayscale view of a BGR or single-channel image (cached per image version)"""
+    return plane(image, 'gray')
+
+
+def gradient_depth(ksize):
+    """int16 holds Sobel responses of uint8 images up to 5x5; 7x7 needs float32"""
+    return cv2.CV_16S if ksize <= 5 else cv2.CV_32F
+
+
+def gradients(image, ksize=3, border=cv2.BORDER_DEFAULT):
+    """(dx, dy) Sobel gradients of the grayscale plane, cached per image version (not for views)
+
+    Kept in int16 (float32 for 7x7) instead of float64. Canny uses the 3x3
+    pair with replicated borders, exactly what cv2.Canny computes itself.
+    """
+    def compute():
+        gray = to_gray(image)
+        depth = gradient_depth(ksize)
+        dx = cv2.Sobel(gray, depth, 1, 0, ksize=ksize, borderType=border)
+        dy = cv2.Sobel(gray, depth, 0, 1, ksize=ksize, borderType=border)
+        dx.setflags(write=False)
+        dy.setflags(write=False)
+        return dx, dy
+    if not owns_data(image):
+        return compute()
+    return _gradients.get_or_compute((image_version(image), ksize, border), compute)
+
+
+def gradient_magnitude(image, ksize=3):
+    """float32 gradient magnitude (cv2.magnitude fuses the square-sum-root)"""
+    dx, dy = gradients(image, ksize)
+    return cv2.magnitude(dx.astype(np.float32), dy.astype(np.float32))
+
+
+def canny_edges(image, low_threshold, high_threshold):
+    """Canny edge map (uint8) from the cached 3x3 gradients"""
+    dx, dy = gradients(image, 3, cv2.BORDER_REPLICATE)
+    return cv2.Canny(dx, dy, low_threshold, high_threshold)
+
+
+def canny_sweep(image, lows, highs):
+    """Canny over a grid of thresholds; gradients are computed once
+
+    Returns [((low, high), edges)] for every low < high pair; only the
+    cheap non-maximum suppression and hysteresis run per pair.
+    """
+    return [((low, high), canny_edges(image, low, high))
+            for low in lows for high in highs if low < high]
+
+
+@register_op('canny', params=[
+    Param('low_threshold', int, 50, 0, 255),
+    Param('high_threshold', int, 150, 0, 500),
+], label='Canny', category='Edge Detection', output_channels=3)
+def canny(image, low_threshold=50, high_threshold=150):
+    """Canny edge detection"""
+    edges = canny_edges(image, low_threshold, high_threshold)
+    return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+
+
+@register_op('sobel', params=[
+    Param('ksize', int, 3, choices=(1, 3, 5, 7)),
+], label='Sobel', category='Edge Detection', output_channels=3)
+def sobel(image, ksize=3):
+    """Sobel gradient magnitude (normalized to the strongest edge)"""
+    magnitude = gradient_magnitude(image, ksize)
+    peak = magnitude.max()
+    if peak > 0:
+        magnitude *= 255 / peak
+    magnitude = magnitude.astype(np.uint8)
+    return cv2.cvtColor(magnitude, cv2.COLOR_GRAY2BGR)
+
+
+@register_op('laplacian', params=[
+    Param('ksize', int, 3, choices=(1, 3, 5, 7)),
+], label='Laplacian', category='Edge Detection', output_channels=3,
+    halo=lambda p: max(1, p['ksize'] // 2))
+def laplacian(image, ksize=3):
+    """Laplacian edge detection"""
+    result = cv2.Laplacian(to_gray(image), gradient_depth(ksize), ksize=ksize)
+    result = cv2.convertScaleAbs(result)  # |response|, saturated at 255
+    return cv2.cvtColor(result, cv2.COLOR_GRAY2BGR)
@@ -0,0 +1,135 @@
+"""
+Image Encode - on-demand download encoding, memoized per image version and settings
+"""
+
+import os
+import struct
+import tempfile
+import zlib
+import cv2
+import numpy as np
+from config import ENCODE_CACHE_SIZE, PNG_COMPRESSION, JPEG_QUALITY
+from ops.cache import LRUCache, image_version
+
+ENCODE_FORMATS = {
+    'PNG': '.png',
+    'JPEG': '.jpg',
+}
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# (image version, format, settings) -> temp file path; evicted files are deleted
+_encoded = LRUCache(ENCODE_CACHE_SIZE, on_evict=_remove_file)
+
+
+def encode_params(output_format, png_compression=PNG_COMPRESSION, jpeg_quality=JPEG_QUALITY,
+                  progressive=False):
+    """cv2.imwrite flags for a format"""
+    if output_format == 'PNG':
+        return [int(cv2.IMWRITE_PNG_COMPRESSION), int(png_compression)]
+    if output_format == 'JPEG':
+        return [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality),
+                int(cv2.IMWRITE_JPEG_PROGRESSIVE), int(bool(progressive))]
+    raise ValueError(f"Unknown output format '{output_format}'")
+
+
+def encode_to_file(image, output_format='PNG', **settings):
+    """Encode straight to a temp file (the encoder streams its output, no in-memory copy)"""
+    params = encode_params(output_format, **settings)
+    if output_format == 'JPEG' and len(image.shape) == 3 and image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    
+    fd, path = tempfile.mkstemp(suffix=ENCODE_FORMATS[output_format], prefix="visionlab_")
+    os.close(fd)
+    try:
+        if not cv2.imwrite(path, image, params):
+            raise ValueError(f"Could not encode image as {output_format}")
+    except Exception:
+        _remove_file(path)
+        raise
+    return path
+
+
+def encoded_file(image, output_format='PNG', **settings):
+    """Path of the encoded image, encoding only on the first request"""
+    key = (image_version(image), output_format, tuple(sorted(settings.items())))
+    path = _encoded.get(key)
+    if path is None or not os.path.exists(path):
+        path = _encoded.put(key, encode_to_file(image, output_format, **settings))
+    return path
+
+
+def encoded_stream(image, output_format='PNG', **settings):
+    """Encoded image opened for reading (memoized file; the reader gets it without an extra bytes copy)"""
+    return open(encoded_file(image, output_format, **settings), 'rb')
+
+
+class PNGStreamWriter:
+    """Write a PNG band by band, so the full image never has to exist in memory"""
+
+    COLOR_TYPES = {1: 0, 3: 2, 4: 6}  # channels -> PNG color type (gray, RGB, RGBA)
+
+    def __init__(self, path, width, height, channels=3, compression=PNG_COMPRESSION):
+        if channels not in self.COLOR_TYPES:
+            raise ValueError(f"Unsupported channel count {channels}")
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.rows_written = 0
+        self._previous = np.zeros((1, width * channels), np.uint8)
+        self._compressor = zlib.compressobj(int(compression))
+        self._file = open(path, 'wb')
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, self.COLOR_TYPES[channels], 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack('>I', len(data)) + kind + data)
+        self._file.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def write(self, rows):
+        """Append a band of BGR/BGRA/gray uint8 rows"""
+        if rows.ndim == 3 and rows.shape[2] == 3:
+            rows = cv2.cvtColor(rows, cv2.COLOR_BGR2RGB)
+        elif rows.ndim == 3 and rows.shape[2] == 4:
+            rows = cv2.cvtColor(rows, cv2.COLOR_BGRA2RGBA)
+        rows = rows.reshape(rows.shape[0], -1)
+        if rows.shape[1] != self.width * self.channels:
+            raise ValueError("Band width does not match the image")
+        
+        # "Up" filter: each row minus the one above (uint8 wraps like PNG expects)
+        stacked = np.concatenate([self._previous, rows])
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(stacked[1:], stacked[:-1], out=filtered[:, 1:])
+        self._previous = rows[-1:].copy()
+        self.rows_written += rows.shape[0]
+        
+        data = self._compressor.compress(filtered.tobytes())
+        if data:
+            self._chunk(b'IDAT', data)
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+            self._chunk(b'IDAT', self._compressor.flush())
+            self._chunk(b'IEND', b'')
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            self._file.close()
@@ -0,0 +1,231 @@
+"""
+Enhancement Operations - auto enhance, low-light and upscaling
+"""
+
+from fractions import Fraction
+from functools import partial
+import cv2
+import numpy as np
+from config import TILE_SIZE
+from ops.registry import register_op, Param
+from ops.tiling import gaussian_radius, render_tiled, run_tiled
+from ops.lut import apply_lut, gamma_lut
+from ops.smoothing import SMOOTHING_ENGINES, smooth, smoothing_halo
+
+INTERPOLATION_MAP = {
+    'Nearest Neighbor': cv2.INTER_NEAREST,
+    'Bilinear': cv2.INTER_LINEAR,
+    'Bicubic': cv2.INTER_CUBIC,
+    'Lanczos': cv2.INTER_LANCZOS4
+}
+
+
+@register_op('auto_enhance', params=[
+    Param('strength', int, 50, 0, 100),
+    Param('engine', str, 'exact', choices=list(SMOOTHING_ENGINES)),
+], label='Auto Enhance', category='Auto Enhancer')
+def auto_enhance(image, strength=50, engine='exact'):
+    """Apply automatic enhancement"""
+    # Gamma correction
+    gamma = 1.0 + (strength / 100.0) * 0.5
+    result = apply_lut(image, gamma_lut(gamma))
+    
+    # CLAHE
+    if len(result.shape) == 3:
+        lab = cv2.cvtColor(result, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        clahe = cv2.createCLAHE(clipLimit=2.0 + strength/50, tileGridSize=(8,8))
+        l = clahe.apply(l)
+        result = cv2.merge([l, a, b])
+        result = cv2.cvtColor(result, cv2.COLOR_LAB2BGR)
+    
+    # Sharpening and denoising are local, so they run tile by tile
+    denoise_halo = smoothing_halo(engine, 5) if strength > 30 else 0
+    if denoise_halo is None:
+        return sharpen_and_denoise(result, strength, engine)
+    return run_tiled(result, lambda tile: sharpen_and_denoise(tile, strength, engine),
+                     gaussian_radius(3) + denoise_halo)
+
+
+def sharpen_and_denoise(image, strength, engine='exact'):
+    """Unsharp mask followed by a light bilateral filter"""
+    # Sharpening
+    blur = cv2.GaussianBlur(image, (0, 0), 3)
+    sharpening_strength = strength / 100.0
+    result = cv2.addWeighted(image, 1.0 + sharpening_strength, blur, -sharpening_strength, 0)
+    
+    # Denoising
+    if strength > 30:
+        result = smooth(result, 5, 50, 50, engine)
+    
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+
+@register_op('low_light', params=[
+    Param('gamma', float, 2.0, 1.0, 3.5),
+    Param('clahe_strength', float, 2.0, 1.0, 5.0),
+    Param('denoise_strength', int, 5, 0, 15, spatial=True),
+    Param('engine', str, 'exact', choices=list(SMOOTHING_ENGINES)),
+], label='Low-Light Enhance', category='Low-Light Enhancer')
+def enhance_low_light(image, gamma=2.2, clahe_strength=2.0, denoise_strength=5, engine='exact'):
+    """Enhance low-light images"""
+    # Gamma correction
+    result = apply_lut(image, gamma_lut(gamma))
+    
+    # CLAHE in HSV
+    if len(result.shape) == 3:
+        hsv = cv2.cvtColor(result, cv2.COLOR_BGR2HSV)
+        h, s, v = cv2.split(hsv)
+        clahe = cv2.createCLAHE(clipLimit=clahe_strength, tileGridSize=(8, 8))
+        v = clahe.apply(v)
+        hsv = cv2.merge([h, s, v])
+        result = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+    
+    # Denoise
+    if denoise_strength > 0:
+        def denoise(tile):
+            return smooth(tile, denoise_strength, 75, 75, engine)
+        halo = smoothing_halo(engine, denoise_strength)
+        result = denoise(result) if halo is None else run_tiled(result, denoise, halo)
+    
+    return result
+
+
+SHARPEN_KERNEL = np.array([[-1,-1,-1], [-1, 9,-1], [-1,-1,-1]])
+
+# Largest q (scale p/q) for which block-aligned cv2.resize windows are used
+MAX_ALIGNED_DENOMINATOR = 16
+
+# Source pixels each interpolation reads beyond the mapped position
+INTERPOLATION_SUPPORT = {
+    cv2.INTER_NEAREST: 1,
+    cv2.INTER_LINEAR: 1,
+    cv2.INTER_CUBIC: 2,
+    cv2.INTER_LANCZOS4: 4,
+}
+
+
+def aligned_scale(shape, size):
+    """True when the scale is a small rational p/q on both axes (regions can be resized independently)"""
+    height, width = shape[:2]
+    return max(Fraction(size[0], width).denominator, Fraction(size[1], height).denominator) <= MAX_ALIGNED_DENOMINATOR
+
+
+def resize_region(image, size, y0, y1, x0, x1, interpolation=cv2.INTER_CUBIC):
+    """Rows y0:y1, columns x0:x1 of image resized to size=(width, height)
+
+    Bit-identical to slicing a full cv2.resize. When the scale is a small
+    rational p/q on both axes (aligned_scale), only a block-aligned source
+    window is resized, so regions can be rendered independently. Other
+    scales have no window with the same sampling phase, so the whole image
+    is resized; callers rendering many regions should resize once instead.
+    """
+    if not aligned_scale(image.shape, size):
+        return cv2.resize(image, size, interpolation=interpolation)[y0:y1, x0:x1]
+    
+    height, width = image.shape[:2]
+    scale_x, scale_y = Fraction(size[0], width), Fraction(size[1], height)
+    margin = INTERPOLATION_SUPPORT.get(interpolation, 4) + 1
+    cx0, cx1, ox = aligned_window(x0, x1, scale_x, width, margin)
+    cy0, cy1, oy = aligned_window(y0, y1, scale_y, height, margin)
+    window_size = (int((cx1 - cx0) * scale_x), int((cy1 - cy0) * scale_y))
+    resized = cv2.resize(image[cy0:cy1, cx0:cx1], window_size, interpolation=interpolation)
+    return resized[y0 - oy:y1 - oy, x0 - ox:x1 - ox]
+
+
+def aligned_window(start, stop, scale, length, margin):
+    """Source window for output [start, stop) at scale p/q, aligned to q-pixel blocks
+
+    Returns (source start, source stop, output offset of the window). Window
+    edges land on block boundaries (or the image edge), where the resize
+    phase matches the full image, plus margin pixels of real neighbours.
+    """
+    p, q = scale.numerator, scale.denominator
+    pad = -(-margin // q)
+    first = max(0, start // p - pad)
+    last = -(-stop // p) + pad
+    return first * q, min(length, last * q), first * p
+
+
+def upscale_sizes(width, height, scale_factor, steps=1):
+    """Output (width, height) of each progressive step; the last is the final size"""
+    final = (int(width * scale_factor), int(height * scale_factor))
+    sizes = []
+    for step in range(1, steps):
+        factor = scale_factor ** (step / steps)
+        sizes.append((int(round(width * factor)), int(round(height * factor))))
+    return sizes + [final]
+
+
+def upscale_region(image, size, interpolation, sharpen):
+    """render_tiled callback: resize (and sharpen) one output region
+
+    For scales without aligned windows the image is resized whole once and
+    only the sharpening runs per region.
+    """
+    if aligned_scale(image.shape, size):
+        resize = partial(resize_region, image, size, interpolation=interpolation)
+    else:
+        resized = cv2.resize(image, size, interpolation=interpolation)
+        def resize(y0, y1, x0, x1):
+            return resized[y0:y1, x0:x1]
+    
+    def render(y0, y1, x0, x1):
+        region = resize(y0, y1, x0, x1)
+        if sharpen:
+            # The 1-pixel halo from render_tiled gives the kernel real neighbours
+            region = cv2.filter2D(region, -1, SHARPEN_KERNEL)
+        return region
+    return render
+
+
+def upscale_steps(image, scale_factor, method='Bicubic', steps=1):
+    """Run all but the last progressive step; returns (image, final size)"""
+    interpolation = INTERPOLATION_MAP.get(method, cv2.INTER_CUBIC)
+    sizes = upscale_sizes(image.shape[1], image.shape[0], scale_factor, steps)
+    for size in sizes[:-1]:
+        image = render_tiled((size[1], size[0]), upscale_region(image, size, interpolation, False))
+    return image, sizes[-1]
+
+
+@register_op('upscale', params=[
+    Param('scale_factor', float, 2.0, 1.0, 8.0),
+    Param('method', str, 'Bicubic', choices=list(INTERPOLATION_MAP)),
+    Param('sharpen', bool, True),
+    Param('steps', int, 1, 1, 4),
+], label='Upscale', category='Image Upscaler')
+def upscale_image(image, scale_factor, method='Bicubic', sharpen=True, steps=1):
+    """Upscale image (tiled; resize and sharpen fused per output tile)"""
+    interpolation = INTERPOLATION_MAP.get(method, cv2.INTER_CUBIC)
+    image, size = upscale_steps(image, scale_factor, method, steps)
+    render = upscale_region(image, size, interpolation, sharpen)
+    return render_tiled((size[1], size[0]), render, 1 if sharpen else 0)
+
+
+def upscale_to_file(image, path, scale_factor, method='Bicubic', sharpen=True, steps=1,
+                    compression=None, band_rows=TILE_SIZE):
+    """Upscale straight into a PNG, one band of output rows at a time
+
+    Only the current band (plus the smaller intermediate steps) is held in
+    memory, so targets far larger than RAM-friendly arrays can be written.
+    Scales that aren't a small p/q (see aligned_scale) resize whole first.
+    """
+    from ops.encode import PNG_COMPRESSION, PNGStreamWriter
+    
+    interpolation = INTERPOLATION_MAP.get(method, cv2.INTER_CUBIC)
+    image, (width, height) = upscale_steps(image, scale_factor, method, steps)
+    render = upscale_region(image, (width, height), interpolation, sharpen)
+    halo = 1 if sharpen else 0
+    channels = image.shape[2] if len(image.shape) == 3 else 1
+    
+    with PNGStreamWriter(path, width, height, channels,
+                         PNG_COMPRESSION if compression is None else compression) as writer:
+        for top in range(0, height, band_rows):
+            bottom = min(height, top + band_rows)
+            hy0, hy1 = max(0, top - halo), min(height, bottom + halo)
+            
+            # Render the band (with a row halo) as tiles, then keep its own rows
+            band = render_tiled((hy1 - hy0, width),
+                                lambda y0, y1, x0, x1: render(y0 + hy0, y1 + hy0, x0, x1), halo)
+            writer.write(band[top - hy0:bottom - hy0])
+    return width, height
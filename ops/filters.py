@@ -0,0 +1,70 @@
+"""
+Filter Operations - artistic and effect filters
+"""
+
+import cv2
+import numpy as np
+from ops.blur import BLUR_ENGINES, blur_halo, gaussian
+from ops.registry import register_op, Param
+from ops.lut import IDENTITY, apply_lut
+from ops.planes import plane
+
+SEPIA_KERNEL = np.array([[0.272, 0.534, 0.131],
+                         [0.349, 0.686, 0.168],
+                         [0.393, 0.769, 0.189]])
+
+EMBOSS_KERNEL = np.array([[-2, -1, 0], [-1, 1, 1], [0, 1, 2]])
+
+SHARPEN_KERNEL = np.array([[-1,-1,-1], [-1, 9,-1], [-1,-1,-1]])
+
+
+@register_op('sketch', params=[
+    Param('sigma', float, 3.5, 0.5, 200, spatial=True),
+], label='Sketch', category='Filter Gallery', channels=(3,), halo=lambda p: blur_halo(p['sigma']))
+def sketch(image, sigma=3.5):
+    """Pencil sketch effect (sigma sets the stroke width)"""
+    gray = plane(image, 'gray')
+    inv_gray = 255 - gray
+    blur = gaussian(inv_gray, sigma)
+    result = cv2.divide(gray, 255 - blur, scale=256)
+    return cv2.cvtColor(result, cv2.COLOR_GRAY2BGR)
+
+
+@register_op('blur', params=[
+    Param('sigma', float, 5.0, 0.1, 500, spatial=True),
+    Param('engine', str, 'auto', choices=BLUR_ENGINES),
+], label='Blur', category='Filter Gallery', halo=lambda p: blur_halo(p['sigma'], p['engine']))
+def blur(image, sigma=5.0, engine='auto'):
+    """Gaussian blur; cost does not grow with sigma above the direct range"""
+    return gaussian(image, sigma, engine)
+
+
+@register_op('sepia', label='Sepia', category='Filter Gallery', channels=(3,), halo=0, color=True)
+def sepia(image):
+    """Sepia tone"""
+    result = cv2.transform(image, SEPIA_KERNEL)
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+
+@register_op('emboss', label='Emboss', category='Filter Gallery', halo=1)
+def emboss(image):
+    """Emboss effect"""
+    result = cv2.filter2D(image, -1, EMBOSS_KERNEL) + 128
+    return np.clip(result, 0, 255).astype(np.uint8)
+
+
+def negative_lut():
+    return 255 - IDENTITY
+
+
+@register_op('negative', label='Negative', category='Filter Gallery', lut=negative_lut, color=True)
+def negative(image):
+    """Invert all pixel values"""
+    return apply_lut(image, negative_lut())
+
+
+@register_op('sharpen', label='Sharpen', category='Filter Gallery', halo=1)
+def sharpen(image):
+    """3x3 sharpening kernel"""
+    result = cv2.filter2D(image, -1, SHARPEN_KERNEL)
+    return np.clip(result, 0, 255).astype(np.uint8)
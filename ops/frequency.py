@@ -0,0 +1,153 @@
+"""
+Frequency Operations - real-input float32 FFT engine and frequency-domain filters
+"""
+
+import cv2
+import numpy as np
+from scipy import fft
+from config import FFT_CACHE_MB, FFT_WORKERS
+from ops.cache import LRUCache, image_version
+from ops.planes import plane
+from ops.registry import register_op, Param
+
+FILTER_SHAPES = ['Gaussian', 'Butterworth', 'Ideal']
+
+# Per-channel spectra are large (complex64, ~8 bytes per coefficient per channel), so bound them by bytes
+_spectra = LRUCache(4, maxbytes=FFT_CACHE_MB * 1024 * 1024)
+_magnitudes = LRUCache(4)
+
+
+class Spectrum:
+    """rfft2 of an image (all channels at once), padded to fast FFT sizes"""
+
+    def __init__(self, image):
+        self.shape = image.shape
+        height, width = image.shape[:2]
+        self.padded = (fft.next_fast_len(height, real=True), fft.next_fast_len(width, real=True))
+        
+        # Reflect-pad to the fast size so the periodic wrap doesn't add edge ringing
+        data = cv2.copyMakeBorder(image, 0, self.padded[0] - height, 0, self.padded[1] - width,
+                                  cv2.BORDER_REFLECT)
+        self.coefficients = fft.rfft2(data.astype(np.float32), axes=(0, 1), workers=FFT_WORKERS)
+        self._grid = None
+
+    @property
+    def nbytes(self):
+        """Memory held by the coefficients plus the radius grid built on first use"""
+        return self.coefficients.nbytes + self.coefficients.shape[0] * self.coefficients.shape[1] * 4
+
+    def radius(self):
+        """Distance of each coefficient from DC, in cycles per image (plus fy, fx)"""
+        if self._grid is None:
+            height, width = self.shape[:2]
+            fy = fft.fftfreq(self.padded[0]).astype(np.float32)[:, None] * height
+            fx = fft.rfftfreq(self.padded[1]).astype(np.float32)[None, :] * width
+            self._grid = (np.sqrt(fy * fy + fx * fx), fy, fx)
+        return self._grid
+
+    def filtered(self, mask):
+        """Inverse transform of the spectrum multiplied by a real mask"""
+        if self.coefficients.ndim == 3:
+            mask = mask[:, :, None]
+        data = fft.irfft2(self.coefficients * mask, s=self.padded, axes=(0, 1), workers=FFT_WORKERS)
+        data = data[:self.shape[0], :self.shape[1]]
+        return np.clip(data + 0.5, 0, 255).astype(np.uint8)
+
+    def magnitude(self):
+        """Centered log-magnitude of the full (mirrored) spectrum of a single-channel image, as uint8"""
+        half = np.log1p(np.abs(self.coefficients))
+        
+        # Rebuild the negative-frequency columns from conjugate symmetry
+        rows, width = self.padded[0], self.padded[1]
+        full = np.empty((rows, width), np.float32)
+        full[:, :half.shape[1]] = half
+        columns = np.arange(half.shape[1], width)
+        full[:, half.shape[1]:] = half[(-np.arange(rows)) % rows][:, width - columns]
+        
+        full = fft.fftshift(full)
+        return cv2.normalize(full, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+
+
+def spectrum(image):
+    """Per-channel forward transform for filtering, kept while it fits FFT_CACHE_MB"""
+    return _spectra.get_or_compute(image_version(image), lambda: Spectrum(image))
+
+
+def magnitude_spectrum(image):
+    """Display-ready magnitude spectrum, cached per image version
+
+    Computed from the gray plane: one transform instead of one per channel,
+    and only the uint8 result is kept.
+    """
+    return _magnitudes.get_or_compute(image_version(image), lambda: Spectrum(plane(image, 'gray')).magnitude())
+
+
+def transfer(radius, cutoff, shape='Gaussian', order=2):
+    """Low-pass transfer function of the given shape"""
+    cutoff = max(float(cutoff), 1e-6)
+    if shape == 'Ideal':
+        return (radius <= cutoff).astype(np.float32)
+    if shape == 'Butterworth':
+        return 1.0 / (1.0 + (radius / cutoff) ** (2 * order))
+    return np.exp(-(radius * radius) / (2.0 * cutoff * cutoff))
+
+
+def keep_mean(mask):
+    """Pass DC so high-pass results keep the image's mean brightness"""
+    mask[0, 0] = 1.0
+    return mask
+
+
+@register_op('lowpass', params=[
+    Param('cutoff', float, 30.0, 1.0, 1000.0),
+    Param('shape', str, 'Gaussian', choices=FILTER_SHAPES),
+], label='Low-Pass Filter', category='Frequency Domain')
+def lowpass(image, cutoff=30.0, shape='Gaussian'):
+    """Keep frequencies below cutoff (cycles per image)"""
+    spec = spectrum(image)
+    radius, _, _ = spec.radius()
+    return spec.filtered(transfer(radius, cutoff, shape))
+
+
+@register_op('highpass', params=[
+    Param('cutoff', float, 30.0, 1.0, 1000.0),
+    Param('shape', str, 'Gaussian', choices=FILTER_SHAPES),
+], label='High-Pass Filter', category='Frequency Domain')
+def highpass(image, cutoff=30.0, shape='Gaussian'):
+    """Keep frequencies above cutoff (cycles per image), preserving the mean"""
+    spec = spectrum(image)
+    radius, _, _ = spec.radius()
+    return spec.filtered(keep_mean(1.0 - transfer(radius, cutoff, shape)))
+
+
+@register_op('bandpass', params=[
+    Param('low', float, 10.0, 0.0, 1000.0),
+    Param('high', float, 60.0, 1.0, 1000.0),
+    Param('shape', str, 'Gaussian', choices=FILTER_SHAPES),
+], label='Band-Pass Filter', category='Frequency Domain')
+def bandpass(image, low=10.0, high=60.0, shape='Gaussian'):
+    """Keep frequencies between low and high (cycles per image), preserving the mean"""
+    if low >= high:
+        raise ValueError("low must be below high")
+    spec = spectrum(image)
+    radius, _, _ = spec.radius()
+    mask = transfer(radius, high, shape)
+    if low > 0:
+        mask = mask - transfer(radius, low, shape)
+    return spec.filtered(keep_mean(mask))
+
+
+@register_op('notch', params=[
+    Param('u', float, 20.0, -1000.0, 1000.0),
+    Param('v', float, 0.0, -1000.0, 1000.0),
+    Param('radius', float, 3.0, 0.5, 100.0),
+], label='Notch Filter', category='Frequency Domain')
+def notch(image, u=20.0, v=0.0, radius=3.0):
+    """Reject a periodic pattern at (u, v) cycles per image and its mirror"""
+    spec = spectrum(image)
+    _, fy, fx = spec.radius()
+    mask = np.ones((fy.shape[0], fx.shape[1]), np.float32)
+    for su, sv in ((u, v), (-u, -v)):
+        distance = np.sqrt((fx - su) ** 2 + (fy - sv) ** 2)
+        mask *= 1.0 - np.exp(-(distance * distance) / (2.0 * radius * radius))
+    return spec.filtered(keep_mean(mask))
@@ -0,0 +1,31 @@
+"""
+Guided Filter - edge-aware smoothing steered by a guide image (He et al.)
+"""
+
+import cv2
+import numpy as np
+
+
+def guided_filter(guide, src, radius, eps=1e-3):
+    """Smooth src (float32) so its edges follow a grayscale uint8 guide
+
+    Local linear model q = a * I + b fitted in (2r+1)^2 windows; eps is the
+    regularization in guide units of [0, 1]^2 (larger = smoother).
+    """
+    guide = guide.astype(np.float32) * (1.0 / 255.0)
+    src = src.astype(np.float32)
+    ksize = (2 * radius + 1, 2 * radius + 1)
+    
+    def box(x):
+        return cv2.boxFilter(x, cv2.CV_32F, ksize, borderType=cv2.BORDER_REFLECT)
+    
+    mean_i = box(guide)
+    mean_p = box(src)
+    var_i = box(guide * guide)
+    var_i -= mean_i * mean_i
+    cov_ip = box(guide * src)
+    cov_ip -= mean_i * mean_p
+    
+    a = cov_ip / (var_i + eps)
+    b = mean_p - a * mean_i
+    return box(a) * guide + box(b)
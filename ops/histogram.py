@@ -0,0 +1,89 @@
+"""
+Histograms - per-channel, luminance and cumulative histograms cached per image version
+"""
+
+import cv2
+import numpy as np
+from ops.cache import LRUCache, image_version
+
+_histograms = LRUCache(8)
+
+HISTOGRAM_BLOCK_PIXELS = 1 << 16  # rows per block are sized to stay in cache
+
+
+class Histograms:
+    """256-bin histograms of a uint8 image
+
+    B/G/R and luminance counts come from a single traversal: the image is
+    read in row blocks small enough to stay in cache, and each block is
+    counted per channel and converted to gray while it is resident.
+    """
+
+    def __init__(self, image):
+        if image.dtype != np.uint8:
+            raise TypeError(f"Histograms need uint8 input, got {image.dtype}")
+        self.total = image.shape[0] * image.shape[1]
+        
+        if len(image.shape) == 2:
+            self.channels = cv2.calcHist([image], [0], None, [256], [0, 256]).reshape(1, 256)
+            self.luminance = self.channels[0]
+        else:
+            # Alpha is not a color channel
+            count = min(image.shape[2], 3)
+            self.channels = np.zeros((count, 256))
+            self.luminance = np.zeros(256) if count == 3 else self.channels[0]
+            to_gray = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            rows = max(1, HISTOGRAM_BLOCK_PIXELS // image.shape[1])
+            for top in range(0, image.shape[0], rows):
+                block = image[top:top + rows]
+                for c in range(count):
+                    self.channels[c] += cv2.calcHist([block], [c], None, [256], [0, 256]).ravel()
+                if count == 3:
+                    self.luminance += cv2.calcHist([cv2.cvtColor(block, to_gray)], [0], None,
+                                                   [256], [0, 256]).ravel()
+        
+        self.channels = self.channels.astype(np.int64)
+        self.luminance = self.luminance.astype(np.int64)
+        self.cumulative = np.cumsum(self.channels, axis=1)
+        self.cumulative_luminance = np.cumsum(self.luminance)
+
+    def percentile(self, percent, channel=None):
+        """Lowest level at or below which percent of the pixels lie (channel None = luminance)"""
+        cumulative = self.cumulative_luminance if channel is None else self.cumulative[channel]
+        return int(np.searchsorted(cumulative, self.total * percent / 100.0))
+
+    def clipped(self, channel=None):
+        """Fraction of pixels at 0 and at 255 (shadow / highlight clipping)"""
+        hist = self.luminance if channel is None else self.channels[channel]
+        return hist[0] / self.total, hist[255] / self.total
+
+    def mean(self, channel=None):
+        hist = self.luminance if channel is None else self.channels[channel]
+        return float(np.dot(hist, np.arange(256)) / self.total)
+
+
+def histograms(image):
+    """Histograms for an image, computed once per version"""
+    return _histograms.get_or_compute(image_version(image), lambda: Histograms(image))
+
+
+def equalize_lut(hist):
+    """LUT matching cv2.equalizeHist for a 256-bin histogram"""
+    hist = np.asarray(hist, np.int64)
+    lut = np.zeros(256, np.uint8)
+    first = int(np.flatnonzero(hist)[0])
+    total = int(hist.sum())
+    if hist[first] == total:
+        return np.full(256, first, np.uint8)
+    scale = np.float32(255.0) / np.float32(total - hist[first])
+    cumulative = np.cumsum(hist[first + 1:]).astype(np.float32) * scale
+    lut[first + 1:] = np.clip(np.rint(cumulative), 0, 255).astype(np.uint8)
+    return lut
+
+
+def levels_lut(low, high):
+    """Linear stretch of [low, high] to [0, 255]"""
+    values = np.arange(256, dtype=np.float32)
+    if high <= low:
+        return values.astype(np.uint8)
+    return np.clip(np.rint((values - low) * (255.0 / (high - low))), 0, 255).astype(np.uint8)
@@ -0,0 +1,161 @@
+"""
+Undo History - operation journal with sparse, budgeted checkpoints
+"""
+
+import itertools
+import cv2
+import numpy as np
+from ops.registry import get_operation
+
+# Journal positions, unique across histories (survive budget trimming)
+_serials = itertools.count(1)
+
+
+class CompressedImage:
+    """Losslessly compressed (PNG) copy of an image"""
+
+    def __init__(self, image, level=1):
+        ok, buffer = cv2.imencode('.png', image, [int(cv2.IMWRITE_PNG_COMPRESSION), level])
+        if not ok:
+            raise ValueError("Could not compress checkpoint")
+        self.data = buffer
+        self.nbytes = buffer.nbytes
+
+    def decode(self):
+        return cv2.imdecode(self.data, cv2.IMREAD_UNCHANGED)
+
+
+class HistoryStep:
+    """One journal entry: the op that produced a state, plus an optional checkpoint"""
+
+    def __init__(self, op=None, params=None, checkpoint=None):
+        self.op = op
+        self.params = params or {}
+        self.checkpoint = checkpoint
+        self.serial = next(_serials)
+
+    @property
+    def has_checkpoint(self):
+        return self.checkpoint is not None
+
+    def image(self):
+        """Full-resolution image stored at this step"""
+        if isinstance(self.checkpoint, CompressedImage):
+            return self.checkpoint.decode()
+        return self.checkpoint
+
+
+class History:
+    """Undo history stored as (op, params) steps plus sparse checkpoints
+
+    steps[0] is the base state. Every other step records the operation that
+    produced it, and undo replays the journal from the nearest checkpoint.
+    Images are treated as immutable, so checkpoints hold references to the
+    arrays and copy nothing.
+    """
+
+    def __init__(self, budget_bytes=512 * 1024 * 1024, checkpoint_interval=5):
+        self.budget_bytes = budget_bytes
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.steps = []
+        self._tip = None
+
+    def __len__(self):
+        """Number of undoable steps"""
+        return max(0, len(self.steps) - 1)
+
+    @property
+    def tip_serial(self):
+        """Journal position of the current state (0 when empty)"""
+        return self.steps[-1].serial if self.steps else 0
+
+    def clear(self):
+        self.steps = []
+        self._tip = None
+
+    def record(self, before, op, params, after):
+        """Record that op(before, **params) produced after; returns the step's serial"""
+        if not self.steps:
+            self.steps.append(HistoryStep(checkpoint=before))
+        elif before is not self._tip:
+            # Image changed outside the journal (reset, background swap...)
+            self.steps.append(HistoryStep(checkpoint=before))
+        
+        step = HistoryStep(op, dict(params or {}))
+        if (op is None or get_operation(op).checkpoint
+                or self._steps_since_checkpoint() >= self.checkpoint_interval):
+            step.checkpoint = after
+        self.steps.append(step)
+        self._tip = after
+        self._enforce_budget()
+        return step.serial
+
+    def undo(self, current):
+        """Return the previous state, or None if there is nothing to undo"""
+        if self.steps and current is not self._tip:
+            # Revert a change made outside the journal first
+            self._tip = self.state_at(len(self.steps) - 1)
+            return self._tip
+        if len(self.steps) < 2:
+            return None
+        self.steps.pop()
+        index = len(self.steps) - 1
+        image = self.state_at(index)
+        
+        # Keep the rebuilt state: it is the new tip and will be undone from next
+        self.steps[index].checkpoint = image
+        self._tip = image
+        self._enforce_budget()
+        return image
+
+    def state_at(self, index):
+        """Rebuild the state after step index from the nearest checkpoint"""
+        start = index
+        while not self.steps[start].has_checkpoint:
+            start -= 1
+        image = self.steps[start].image()
+        for step in self.steps[start + 1:index + 1]:
+            image = get_operation(step.op)(image, **step.params)
+        return image
+
+    def journal(self):
+        """(op, params) pairs since the last checkpoint-only step"""
+        entries = []
+        for step in reversed(self.steps[1:]):
+            if step.op is None:
+                break
+            entries.append((step.op, step.params))
+        return entries[::-1]
+
+    def nbytes(self):
+        """Bytes held by checkpoints (the tip is shared with the session image)"""
+        return sum(step.checkpoint.nbytes for step in self.steps
+                   if step.has_checkpoint and step.checkpoint is not self._tip)
+
+    def _steps_since_checkpoint(self):
+        count = 0
+        for step in reversed(self.steps):
+            if step.has_checkpoint:
+                break
+            count += 1
+        return count + 1
+
+    def _enforce_budget(self):
+        """Compress, then evict, the oldest checkpoints until under budget"""
+        if self.nbytes() <= self.budget_bytes:
+            return
+        
+        for step in self.steps:
+            if isinstance(step.checkpoint, np.ndarray) and step.checkpoint is not self._tip:
+                step.checkpoint = CompressedImage(step.checkpoint)
+                if self.nbytes() <= self.budget_bytes:
+                    return
+        
+        # Drop the oldest steps up to the next checkpoint, which becomes the new base
+        while self.nbytes() > self.budget_bytes:
+            next_checkpoint = next((i for i in range(1, len(self.steps)) if self.steps[i].has_checkpoint), None)
+            if next_checkpoint is None:
+                break
+            self.steps = self.steps[next_checkpoint:]
+            self.steps[0].op = None
+            self.steps[0].params = {}
@@ -0,0 +1 @@
+# Ops package
@@ -0,0 +1,105 @@
+"""
+Live Preview - debounced op renders on a thumbnail, newest parameters win
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from config import (LIVE_PREVIEW_BUDGET_MS, LIVE_PREVIEW_DEBOUNCE_MS, LIVE_PREVIEW_MAX_SIDE,
+                    LIVE_PREVIEW_MIN_SIDE, LIVE_PREVIEW_TIMEOUT)
+from ops.cache import LRUCache, image_version
+from ops.proxy import downscale
+from ops.registry import get_operation
+
+SIDE_STEP = 32  # thumbnail sides are rounded so they can be reused across renders
+COST_SMOOTHING = 0.5  # weight of the newest timing in the per-op cost estimate
+
+
+class LivePreview:
+    """Renders previews in one background thread; superseded requests are dropped
+
+    Every request bumps a generation counter. A render waits out the debounce
+    delay and gives up if a newer request arrived meanwhile, and its result is
+    discarded if one arrived while it ran. The thumbnail side is chosen from
+    the measured cost of each op so a render fits in the latency budget.
+    """
+
+    def __init__(self, budget_ms=LIVE_PREVIEW_BUDGET_MS, debounce_ms=LIVE_PREVIEW_DEBOUNCE_MS,
+                 min_side=LIVE_PREVIEW_MIN_SIDE, max_side=LIVE_PREVIEW_MAX_SIDE):
+        self.budget = budget_ms / 1000.0
+        self.debounce = debounce_ms / 1000.0
+        self.min_side = min_side
+        self.max_side = max_side
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._costs = {}  # op name -> seconds per thumbnail pixel
+        self._thumbnails = LRUCache(4)
+        self._last = None  # (request key, preview, seconds)
+
+    def thumbnail_side(self, name, shape):
+        """Longest thumbnail side expected to render name within the budget"""
+        cost = self._costs.get(name)
+        if cost is None:
+            return self.min_side
+        height, width = shape[:2]
+        pixels = self.budget / max(cost, 1e-12)
+        side = math.sqrt(pixels * max(height, width) / min(height, width))
+        side = int(side // SIDE_STEP) * SIDE_STEP
+        return max(self.min_side, min(self.max_side, max(height, width), side))
+
+    def thumbnail(self, image, side):
+        """Downscaled copy of image (cached, so plane caches hit between renders)"""
+        return self._thumbnails.get_or_compute((image_version(image), side), lambda: downscale(image, side))
+
+    def submit(self, image, name, params, factor=1.0):
+        """Queue a render; returns a future of (preview, seconds), or None once superseded
+
+        params are full-resolution values; factor is the scale of image
+        relative to the full-resolution picture (a proxy's factor).
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        return self._executor.submit(self._render, generation, image, name, dict(params), factor)
+
+    def render(self, image, name, params, factor=1.0, timeout=LIVE_PREVIEW_TIMEOUT):
+        """Latest preview for these params, waiting up to timeout for it
+
+        Returns (preview, seconds, current): when the render is still running
+        after timeout the previous preview is returned with current=False.
+        """
+        key = (image_version(image), name, repr(sorted(params.items())), factor)
+        last = self._last
+        if last is not None and last[0] == key:
+            return last[1], last[2], True
+        future = self.submit(image, name, params, factor)
+        try:
+            result = future.result(timeout=timeout)
+        except TimeoutError:
+            result = None
+        if result is None:
+            return (last[1], last[2], False) if last is not None else (None, None, False)
+        self._last = (key,) + result
+        return result[0], result[1], True
+
+    def _superseded(self, generation):
+        return generation != self._generation
+
+    def _render(self, generation, image, name, params, factor):
+        time.sleep(self.debounce)
+        if self._superseded(generation):
+            return None
+        operation = get_operation(name)
+        thumbnail, thumb_factor = self.thumbnail(image, self.thumbnail_side(name, image.shape))
+        scaled = operation.scale_params(params, factor * thumb_factor)
+        start = time.perf_counter()
+        preview = operation(thumbnail, **scaled)
+        elapsed = time.perf_counter() - start
+        cost = elapsed / (thumbnail.shape[0] * thumbnail.shape[1])
+        previous = self._costs.get(name, cost)
+        self._costs[name] = COST_SMOOTHING * cost + (1 - COST_SMOOTHING) * previous
+        if self._superseded(generation):
+            return None
+        return preview, elapsed
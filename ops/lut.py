@@ -0,0 +1,38 @@
+"""
+Point Operations - per-pixel maps compiled into 256-entry lookup tables
+"""
+
+import cv2
+import numpy as np
+
+IDENTITY = np.arange(256, dtype=np.uint8)
+
+
+def channel_lut(*luts):
+    """Stack per-channel LUTs (B, G, R) into a (256, 3) table"""
+    return np.stack([np.broadcast_to(lut, (256,)) for lut in luts], axis=1).astype(np.uint8)
+
+
+def gamma_lut(gamma):
+    """LUT for x -> 255 * (x / 255) ** (1 / gamma), truncated like the float path"""
+    values = np.arange(256, dtype=np.float32) / 255.0
+    values = np.power(values, 1.0 / gamma)
+    return (values * 255).astype(np.uint8)
+
+
+def compose(first, second):
+    """LUT equivalent to applying first, then second"""
+    if first.ndim == 1 and second.ndim == 1:
+        return second[first]
+    first = np.broadcast_to(first.reshape(256, -1), (256, 3))
+    second = np.broadcast_to(second.reshape(256, -1), (256, 3))
+    return np.stack([second[first[:, c], c] for c in range(3)], axis=1)
+
+
+def apply_lut(image, lut):
+    """Apply a 1D (256,) or per-channel (256, 3) LUT in a single pass"""
+    if lut.ndim == 2:
+        if len(image.shape) != 3 or image.shape[2] != 3:
+            raise ValueError("Per-channel LUT needs a 3-channel image")
+        return cv2.LUT(image, lut.reshape(256, 1, 3))
+    return cv2.LUT(image, lut)
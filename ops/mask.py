@@ -0,0 +1,141 @@
+"""
+Mask Store - compact foreground masks and vectorized alpha compositing
+"""
+
+import os
+import tempfile
+import zlib
+import cv2
+import numpy as np
+from config import TILE_SIZE
+from ops.encode import PNG_COMPRESSION, PNGStreamWriter, _remove_file
+
+
+class PackedMask:
+    """Foreground mask kept compact in session state
+    
+    Binary masks are bit-packed (1 bit per pixel, 8x smaller than uint8);
+    soft alpha masks (0-255) are deflate-compressed, which collapses the
+    long constant runs of a matte. Planes are expanded only when composited.
+    """
+
+    def __init__(self, shape, data, soft=False):
+        self.shape = tuple(shape)
+        self.data = data
+        self.soft = soft
+
+    @classmethod
+    def pack(cls, mask, soft=False):
+        """Pack a 0/1 (or 0/255) mask, or a 0-255 alpha plane with soft=True"""
+        if isinstance(mask, cls):
+            return mask
+        mask = np.ascontiguousarray(mask)
+        if soft:
+            return cls(mask.shape, zlib.compress(mask.astype(np.uint8, copy=False), 1), True)
+        return cls(mask.shape, np.packbits(mask.ravel() != 0), False)
+
+    def binary(self):
+        """0/1 uint8 plane"""
+        if self.soft:
+            return (self.alpha() > 127).astype(np.uint8)
+        count = self.shape[0] * self.shape[1]
+        return np.unpackbits(self.data, count=count).reshape(self.shape)
+
+    def alpha(self):
+        """0-255 uint8 alpha plane"""
+        if self.soft:
+            return np.frombuffer(zlib.decompress(self.data), np.uint8).reshape(self.shape)
+        plane = self.binary()
+        plane *= 255
+        return plane
+
+    @property
+    def nbytes(self):
+        return len(self.data)
+
+    def __repr__(self):
+        kind = 'soft' if self.soft else 'binary'
+        return f"PackedMask({self.shape[1]}x{self.shape[0]}, {kind}, {self.nbytes} bytes)"
+
+
+def mask_alpha(mask, shape=None, feather=0):
+    """0-255 alpha plane from a PackedMask or 0/1 array, resized to shape and optionally feathered"""
+    if isinstance(mask, PackedMask):
+        alpha = mask.alpha()
+    else:
+        alpha = np.where(mask != 0, np.uint8(255), np.uint8(0)) if mask.max() <= 1 else mask
+    if shape is not None and alpha.shape != tuple(shape[:2]):
+        alpha = cv2.resize(alpha, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR)
+    if feather > 0:
+        alpha = cv2.GaussianBlur(alpha, (0, 0), feather)
+    return alpha
+
+
+def fit_background(background, shape):
+    """Background color or image as a uint8 array matching an image shape"""
+    if not isinstance(background, np.ndarray):
+        return np.full(shape, background, np.uint8)
+    channels = shape[2] if len(shape) == 3 else 1
+    if background.ndim == 2 and channels == 3:
+        background = cv2.cvtColor(background, cv2.COLOR_GRAY2BGR)
+    elif background.ndim == 3 and background.shape[2] == 4 and channels == 3:
+        background = cv2.cvtColor(background, cv2.COLOR_BGRA2BGR)
+    if background.shape[:2] != tuple(shape[:2]):
+        background = cv2.resize(background, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+    return background
+
+
+def composite(image, mask, background=(0, 0, 0), feather=0):
+    """Foreground over a background color or image in one vectorized pass
+    
+    Hard masks copy foreground pixels onto the background (cv2.copyTo);
+    soft or feathered masks blend with per-pixel weights (cv2.blendLinear).
+    """
+    hard = feather == 0 and not (isinstance(mask, PackedMask) and mask.soft)
+    if hard:
+        if isinstance(mask, PackedMask):
+            plane = mask.binary()
+        else:
+            plane = mask if mask.dtype == np.uint8 else mask.astype(np.uint8)
+        if plane.shape != image.shape[:2]:
+            plane = cv2.resize(plane, (image.shape[1], image.shape[0]), interpolation=cv2.INTER_NEAREST)
+        result = fit_background(background, image.shape)
+        if result is background:
+            result = result.copy()
+        cv2.copyTo(image, plane, result)
+        return result
+    
+    weights = mask_alpha(mask, image.shape, feather).astype(np.float32)
+    weights *= 1 / 255
+    return cv2.blendLinear(image, fit_background(background, image.shape), weights, 1 - weights)
+
+
+def to_rgba(image, mask, feather=0):
+    """BGRA array with the mask as alpha (a single output allocation)"""
+    result = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+    result[:, :, 3] = mask_alpha(mask, image.shape, feather)
+    return result
+
+
+def write_rgba_png(image, mask, path, compression=None, feather=0, band_rows=TILE_SIZE):
+    """Stream image + mask into an RGBA PNG band by band (no full-frame RGBA copy)"""
+    height, width = image.shape[:2]
+    alpha = mask_alpha(mask, image.shape, feather)
+    with PNGStreamWriter(path, width, height, 4,
+                         PNG_COMPRESSION if compression is None else compression) as writer:
+        for top in range(0, height, band_rows):
+            bottom = min(height, top + band_rows)
+            writer.write(cv2.merge([*cv2.split(image[top:bottom]), alpha[top:bottom]]))
+    return path
+
+
+def rgba_png_bytes(image, mask, compression=None, feather=0):
+    """RGBA PNG bytes for download"""
+    fd, path = tempfile.mkstemp(suffix='.png', prefix="visionlab_")
+    os.close(fd)
+    try:
+        write_rgba_png(image, mask, path, compression, feather)
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        _remove_file(path)
@@ -0,0 +1,294 @@
+"""
+Morphology Operations - erosion, dilation, opening, closing, gradient
+"""
+
+import cv2
+import numpy as np
+from ops.registry import register_op, Param
+
+MORPH_OPERATIONS = ['Erosion', 'Dilation', 'Opening', 'Closing', 'Gradient']
+
+ELEMENT_SHAPES = {
+    'Rectangle': cv2.MORPH_RECT,
+    'Ellipse': cv2.MORPH_ELLIPSE,
+    'Cross': cv2.MORPH_CROSS,
+}
+
+WORD_BITS = 64  # pixels per packed word on the binary path
+
+# OpenCV's direct path costs about one pass per element tap and iteration; the
+# separable one about one per rectangle. It pays off from this many taps per
+# rectangle (12 MP gray: ellipse 31 at 73 runs 0.08 s vs 0.13 s; cross 61 at 60 ties)
+DECOMPOSE_MIN_TAPS = 64
+
+
+def structuring_element(shape, size):
+    """Square-bounded structuring element ('Rectangle', 'Ellipse' or 'Cross')"""
+    return cv2.getStructuringElement(ELEMENT_SHAPES[shape], (size, size))
+
+
+def fold_iterations(kernel, iterations):
+    """One element equivalent to applying kernel iterations times (Minkowski sum)"""
+    if iterations <= 1:
+        return kernel
+    kh, kw = kernel.shape
+    folded = np.zeros((iterations * (kh - 1) + 1, iterations * (kw - 1) + 1), np.uint8)
+    folded[folded.shape[0] // 2, folded.shape[1] // 2] = 1
+    for _ in range(iterations):
+        folded = cv2.dilate(folded, kernel)
+    return folded
+
+
+def rect_decomposition(kernel):
+    """Centered (half width, half height) rectangles whose union is kernel, or None
+
+    Works for odd, centered elements whose rows are centered runs that
+    narrow away from the middle row (rectangles, ellipses, crosses and
+    their folds). Each rectangle is then two 1-D running min/max passes.
+    """
+    kh, kw = kernel.shape
+    if kh % 2 == 0 or kw % 2 == 0:
+        return None
+    cy, cx = kh // 2, kw // 2
+    half_widths = []
+    for row in (kernel != 0):
+        columns = np.flatnonzero(row)
+        if len(columns) == 0:
+            half_widths.append(-1)
+            continue
+        half = cx - columns[0]
+        if columns[-1] != cx + half or len(columns) != 2 * half + 1:
+            return None
+        half_widths.append(half)
+    half_widths = np.array(half_widths)
+    if half_widths[cy] < 0 or (half_widths != half_widths[::-1]).any():
+        return None
+    if (np.diff(half_widths[cy:]) > 0).any():
+        return None
+    rects = []
+    for half in sorted(set(half_widths[half_widths >= 0])):
+        rects.append((half, int(np.flatnonzero(half_widths[cy:] >= half)[-1])))
+    return rects
+
+
+def is_binary(image):
+    """Single-channel mask with at most two values, one of them 0"""
+    if len(image.shape) != 2:
+        return False
+    peak = image.max()
+    return not np.count_nonzero((image != 0) & (image != peak))
+
+
+def _nested_union(image, rects, rows, columns, combine):
+    """Union of rectangles from row passes rows(x, grow) and column passes columns(x, half)
+
+    rect_decomposition lists widths rising and heights falling, so the union
+    nests: each wider row pass joins the column pass of the narrower (taller)
+    ones, as min/max distributes over erosion. Row widths grow incrementally
+    and column heights telescope, so both total the element's half size.
+    """
+    result, widened, width, height = None, image, 0, 0
+    for half_w, half_h in rects:
+        if half_w > width:
+            widened = rows(widened, half_w - width)
+        if result is None:
+            result = widened
+        else:
+            tall = columns(result, height - half_h) if height > half_h else result
+            result = combine(widened, tall)
+        width, height = half_w, half_h
+    return columns(result, height) if height else result
+
+
+def _rect_passes(image, rects, erode):
+    """Union-of-rectangles erosion (min) or dilation (max) with separable passes"""
+    if len(image.shape) == 3 and image.shape[2] > 1:
+        # OpenCV's 1-D passes are several times slower on interleaved channels
+        return cv2.merge([_rect_passes(channel, rects, erode) for channel in cv2.split(image)])
+    morph = cv2.erode if erode else cv2.dilate
+    
+    def rows(image, grow):
+        return morph(image, np.ones((1, 2 * grow + 1), np.uint8))
+    
+    def columns(image, half):
+        return morph(image, np.ones((2 * half + 1, 1), np.uint8))
+    
+    return _nested_union(image, rects, rows, columns, cv2.min if erode else cv2.max)
+
+
+def pack_rows(mask):
+    """Binary mask -> (height, words) uint64, 64 pixels per word (bit x % 64 of word x // 64)"""
+    height, width = mask.shape
+    words = -(-width // WORD_BITS)
+    packed = np.zeros((height, words * 8), np.uint8)
+    packed[:, :-(-width // 8)] = np.packbits(mask != 0, axis=1, bitorder='little')
+    return packed.view('<u8')
+
+
+def unpack_rows(words, width):
+    """Inverse of pack_rows: 0/1 uint8 mask"""
+    return np.unpackbits(words.view(np.uint8), axis=1, count=width, bitorder='little')
+
+
+def _shift_columns(words, offset, fill):
+    """Word array whose pixel x holds pixel x + offset (fill beyond the edges)"""
+    height, count = words.shape
+    pad = -(-abs(offset) // WORD_BITS) + 1
+    filler = np.full((height, pad), fill, np.uint64)
+    padded = np.concatenate([filler, words, filler], axis=1)
+    whole, bits = divmod(offset, WORD_BITS)
+    low = padded[:, pad + whole:pad + whole + count]
+    if bits == 0:
+        return low.copy()
+    high = padded[:, pad + whole + 1:pad + whole + 1 + count]
+    return (low >> np.uint64(bits)) | (high << np.uint64(WORD_BITS - bits))
+
+
+def _shift_rows(words, offset, fill):
+    """Word array whose row y holds row y + offset (fill beyond the edges)"""
+    result = np.full_like(words, fill)
+    height = words.shape[0]
+    if abs(offset) >= height:
+        return result
+    if offset >= 0:
+        result[:max(0, height - offset)] = words[offset:]
+    else:
+        result[-offset:] = words[:height + offset]
+    return result
+
+
+def _run(words, length, shift, combine, fill):
+    """Combine over windows [x, x + length) by doubling: O(log length) word passes"""
+    span = 1
+    while span * 2 <= length:
+        words = combine(words, shift(words, span, fill))
+        span *= 2
+    if span < length:
+        words = combine(words, shift(words, length - span, fill))
+    return words
+
+
+def _packed_passes(mask, rects, erode):
+    """Union-of-rectangles morphology on a bit-packed binary mask"""
+    peak = mask.max()
+    fill = np.uint64(0xFFFFFFFFFFFFFFFF) if erode else np.uint64(0)
+    combine = np.bitwise_and if erode else np.bitwise_or
+    
+    # Windows run forward from each pixel and are then shifted back to center,
+    # so pad by the largest reach with the neutral value (outside pixels are ignored)
+    pad_x = max(half_w for half_w, _ in rects)
+    pad_y = max(half_h for _, half_h in rects)
+    mask = cv2.copyMakeBorder(mask, pad_y, pad_y, pad_x, pad_x, cv2.BORDER_CONSTANT, value=int(erode))
+    height, width = mask.shape
+    words = pack_rows(mask)
+    if erode and width % WORD_BITS:
+        # Padding bits past the right edge act as "outside" (neutral for erosion)
+        words[:, -1] |= ~np.uint64((1 << (width % WORD_BITS)) - 1)
+    
+    def rows(words, grow):
+        return _shift_columns(_run(words, 2 * grow + 1, _shift_columns, combine, fill), -grow, fill)
+    
+    def columns(words, half):
+        return _shift_rows(_run(words, 2 * half + 1, _shift_rows, combine, fill), -half, fill)
+    
+    result = _nested_union(words, rects, rows, columns, combine)
+    unpacked = unpack_rows(result, width)[pad_y:height - pad_y, pad_x:width - pad_x]
+    if peak != 1:
+        unpacked *= peak
+    return unpacked.astype(mask.dtype, copy=False)
+
+
+def decomposition(kernel, iterations=1):
+    """(rectangles, repeats) for the separable path, or None when OpenCV's direct path is faster"""
+    single = rect_decomposition(kernel)
+    if single is None:
+        return None
+    
+    # Fold iterations into one element unless it splits into more rectangles
+    # than repeating the small one would take
+    folded = rect_decomposition(fold_iterations(kernel, iterations))
+    if folded is not None and len(folded) <= iterations * len(single):
+        rects, repeats = folded, 1
+    else:
+        rects, repeats = single, iterations
+    if np.count_nonzero(kernel) * iterations < DECOMPOSE_MIN_TAPS * len(rects) * repeats:
+        return None
+    return rects, repeats
+
+
+def _morph(image, kernel, iterations, erode):
+    """Erode/dilate through the fastest exact path for the element"""
+    morph = cv2.erode if erode else cv2.dilate
+    kernel = np.asarray(kernel, np.uint8)
+    plan = decomposition(kernel, iterations)
+    if plan is None:
+        # Small, even or irregular elements: OpenCV's own path (anchor and iterations as given)
+        return morph(image, kernel, iterations=iterations)
+    
+    rects, repeats = plan
+    if len(rects) == 1:
+        # A plain rectangle: OpenCV already runs it as separable 1-D passes
+        half_w, half_h = rects[0]
+        return morph(image, np.ones((2 * half_h + 1, 2 * half_w + 1), np.uint8), iterations=repeats)
+    
+    passes = _packed_passes if image.dtype == np.uint8 and is_binary(image) and image.any() else _rect_passes
+    for _ in range(repeats):
+        image = passes(image, rects, erode)
+    return image
+
+
+def erode(image, kernel, iterations=1):
+    """Same result as cv2.erode(image, kernel, iterations=iterations)
+
+    When the element has enough taps per rectangle (see decomposition),
+    iterations fold into one element, which is split into rectangles applied
+    as nested 1-D running-min passes (independent of the element's area);
+    binary masks run bit-packed, 64 pixels per word operation.
+    """
+    return _morph(image, kernel, iterations, True)
+
+
+def dilate(image, kernel, iterations=1):
+    """Same result as cv2.dilate(image, kernel, iterations=iterations) (see erode)"""
+    return _morph(image, kernel, iterations, False)
+
+
+def morphology_ex(image, operation, kernel, iterations=1):
+    """Opening, closing or gradient built on erode/dilate (cv2.morphologyEx semantics)"""
+    if operation == 'Opening':
+        return dilate(erode(image, kernel, iterations), kernel, iterations)
+    if operation == 'Closing':
+        return erode(dilate(image, kernel, iterations), kernel, iterations)
+    if operation == 'Gradient':
+        return cv2.subtract(dilate(image, kernel, iterations), erode(image, kernel, iterations))
+    raise ValueError(f"Unknown morphology operation '{operation}'")
+
+
+def morphology_halo(params):
+    """Reach of the structuring element over all passes"""
+    radius = params['kernel_size'] // 2
+    if params['operation'] == 'Gradient':
+        return radius
+    if params['operation'] in ('Opening', 'Closing'):
+        return 2 * radius * params['iterations']
+    return radius * params['iterations']
+
+
+@register_op('morphology', params=[
+    Param('operation', str, 'Erosion', choices=MORPH_OPERATIONS),
+    Param('kernel_size', int, 5, 1, 31, spatial=True),
+    Param('iterations', int, 1, 1, 10),
+    Param('shape', str, 'Rectangle', choices=list(ELEMENT_SHAPES)),
+], label='Morphology', category='Morphological Operations', halo=morphology_halo)
+def morphology(image, operation='Erosion', kernel_size=5, iterations=1, shape='Rectangle'):
+    """Apply a morphological operation with a rectangular, elliptical or cross kernel"""
+    kernel = structuring_element(shape, kernel_size)
+    
+    if operation == 'Erosion':
+        return erode(image, kernel, iterations)
+    elif operation == 'Dilation':
+        return dilate(image, kernel, iterations)
+    elif operation == 'Gradient':
+        return morphology_ex(image, operation, kernel)
+    else:  # Opening, Closing
+        return morphology_ex(image, operation, kernel, iterations)
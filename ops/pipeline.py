@@ -0,0 +1,126 @@
+"""
+Pipeline - runs a sequence of registered operations on an array
+"""
+
+from functools import partial
+from ops.color_lut import ColorTable, apply_color_lut
+from ops.lut import apply_lut, compose
+from ops.registry import get_operation
+from ops.tiling import run_tiled
+
+# A single HSV/sepia step runs faster directly than through a color table
+# (12 MP: table gather ~0.16 s, adjust_hsv + sepia ~0.23 s, either alone less)
+BAKE_MIN_STEPS = 2
+
+
+def run_stages(image, stages):
+    """Apply compiled (halo, func) stages in order"""
+    for _, func in stages:
+        image = func(image)
+    return image
+
+
+class Pipeline:
+    """Ordered chain of (operation name, params) steps"""
+
+    def __init__(self, steps=None):
+        self.steps = []
+        for step in steps or []:
+            if isinstance(step, dict):
+                self.add(step['op'], **step.get('params', {}))
+            else:
+                name, params = step
+                self.add(name, **params)
+
+    def add(self, name, **params):
+        """Append a step (parameters are validated immediately)"""
+        op = get_operation(name)
+        self.steps.append((name, op.resolve_params(params)))
+        return self
+
+    def run(self, image, tiled=False, tile_size=None, workers=None, bake_color=False):
+        """Execute all steps and return the result
+
+        With tiled=True, consecutive local stages run together over
+        halo-padded tiles (halo = sum of their radii), one pass per run.
+        With bake_color=True, runs of per-pixel color ops apply as one color table.
+        """
+        stages = self.compile(bake_color)
+        if not tiled:
+            return run_stages(image, stages)
+        
+        result = image
+        for halo, group in self.segments(stages):
+            if halo is None:
+                result = run_stages(result, group)
+            else:
+                result = run_tiled(result, partial(run_stages, stages=group), halo, tile_size, workers)
+        return result
+
+    def compile(self, bake_color=False):
+        """Executable (halo, func) stages
+
+        Runs of point ops fold into one 256-entry LUT. With bake_color=True,
+        runs of ops registered with color=True (HSV, sepia, the color point
+        ops) are grouped instead, and baked into one 24-bit color table when
+        they hold at least BAKE_MIN_STEPS non-point ops; other ops, point ops
+        included, stand alone.
+        """
+        stages = []
+        run = []
+        for name, params in self.steps:
+            op = get_operation(name)
+            if op.is_color_op if bake_color else op.is_point_op:
+                run.append((name, params))
+                continue
+            stages.extend(self._compile_run(run))
+            run = []
+            stages.append((op.tile_halo(params), partial(op, **params)))
+        stages.extend(self._compile_run(run))
+        return stages
+    
+    @staticmethod
+    def _compile_run(run):
+        """Stages for a run of point/color steps"""
+        if not run:
+            return []
+        ops = [get_operation(name) for name, _ in run]
+        if all(op.is_point_op for op in ops):
+            lut = None
+            for op, (_, params) in zip(ops, run):
+                step_lut = op.point_lut(params)
+                lut = step_lut if lut is None else compose(lut, step_lut)
+            return [(0, partial(apply_lut, lut=lut))]
+        
+        chain = Pipeline(run)
+        if sum(not op.is_point_op for op in ops) < BAKE_MIN_STEPS:
+            return chain.compile()
+        return [(0, partial(apply_color_lut, lut=ColorTable.from_pipeline(chain), fallback=chain.run))]
+
+    @staticmethod
+    def segments(stages):
+        """Group stages into (summed halo, stages) runs of local stages; others stand alone"""
+        segments = []
+        for halo, func in stages:
+            if halo is not None and segments and segments[-1][0] is not None:
+                segments[-1] = (segments[-1][0] + halo, segments[-1][1] + [(halo, func)])
+            else:
+                segments.append((halo, [(halo, func)]))
+        return segments
+
+    __call__ = run
+
+    def to_list(self):
+        """Serializable representation of the steps"""
+        return [{'op': name, 'params': dict(params)} for name, params in self.steps]
+
+    @classmethod
+    def from_list(cls, steps):
+        """Build a pipeline from to_list() output"""
+        return cls(steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __repr__(self):
+        return f"Pipeline({[name for name, _ in self.steps]})"
@@ -0,0 +1,54 @@
+"""
+Derived Planes - color conversions of an image, cached per image version
+"""
+
+import cv2
+from config import PLANE_CACHE_SIZE
+from ops.cache import LRUCache, image_version, owns_data
+
+# plane name -> (conversion from BGR, conversion from BGRA)
+PLANE_CONVERSIONS = {
+    'gray': (cv2.COLOR_BGR2GRAY, cv2.COLOR_BGRA2GRAY),
+    'hsv': (cv2.COLOR_BGR2HSV, None),
+    'lab': (cv2.COLOR_BGR2LAB, None),
+    'yuv': (cv2.COLOR_BGR2YUV, None),
+    'rgb': (cv2.COLOR_BGR2RGB, cv2.COLOR_BGRA2RGB),
+}
+
+# (image version, plane name) -> read-only array
+_planes = LRUCache(PLANE_CACHE_SIZE)
+
+
+def convert(image, name):
+    """Compute a derived plane (uncached)"""
+    if name not in PLANE_CONVERSIONS:
+        raise KeyError(f"Unknown plane '{name}'. Available: {sorted(PLANE_CONVERSIONS)}")
+    if len(image.shape) == 2:
+        if name == 'gray':
+            return image
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    from_bgr, from_bgra = PLANE_CONVERSIONS[name]
+    if image.shape[2] == 4:
+        if from_bgra is None:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        else:
+            return cv2.cvtColor(image, from_bgra)
+    return cv2.cvtColor(image, from_bgr)
+
+
+def plane(image, name):
+    """Derived plane ('gray', 'hsv', 'lab', 'yuv', 'rgb') of an image
+
+    Converted once per image version and shared by every op that asks, so
+    repeated clicks on the same image reuse one conversion; views (tiles)
+    are converted without caching. The result is read-only; copy it before
+    modifying.
+    """
+    def compute():
+        result = convert(image, name)
+        if result is not image:
+            result.setflags(write=False)
+        return result
+    if not owns_data(image):
+        return compute()
+    return _planes.get_or_compute((image_version(image), name), compute)
@@ -0,0 +1,34 @@
+"""
+Preview - display-sized, pre-encoded frames cached per image version
+"""
+
+import cv2
+from config import PREVIEW_MAX_SIDE, PREVIEW_FORMAT, PREVIEW_QUALITY
+from ops.cache import LRUCache, image_version
+from ops.proxy import downscale
+
+PREVIEW_ENCODERS = {
+    'JPEG': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+    'WEBP': ('.webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+
+_previews = LRUCache(16)
+
+
+def encode_preview(image, max_side=PREVIEW_MAX_SIDE, output_format=PREVIEW_FORMAT, quality=PREVIEW_QUALITY):
+    """Downscale and encode an image for display"""
+    small, _ = downscale(image, max_side)
+    # JPEG has no alpha channel; WebP keeps it
+    if output_format == 'JPEG' and len(small.shape) == 3 and small.shape[2] == 4:
+        output_format = 'WEBP'
+    extension, quality_flag = PREVIEW_ENCODERS[output_format]
+    ok, buffer = cv2.imencode(extension, small, [int(quality_flag), int(quality)])
+    if not ok:
+        raise ValueError(f"Could not encode preview as {output_format}")
+    return buffer.tobytes()
+
+
+def preview_bytes(image, max_side=PREVIEW_MAX_SIDE, output_format=PREVIEW_FORMAT, quality=PREVIEW_QUALITY):
+    """Encoded preview, computed once per image version and settings"""
+    key = (image_version(image), max_side, output_format, quality)
+    return _previews.get_or_compute(key, lambda: encode_preview(image, max_side, output_format, quality))
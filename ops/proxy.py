@@ -0,0 +1,66 @@
+"""
+Proxy Editing - edit a display-sized copy, replay the chain at full resolution
+"""
+
+import cv2
+from ops.pipeline import Pipeline
+from ops.registry import get_operation
+
+
+def downscale(image, max_side):
+    """Resize so the longest side is at most max_side (returns image, factor)"""
+    height, width = image.shape[:2]
+    factor = min(1.0, max_side / max(height, width))
+    if factor >= 1.0:
+        return image, 1.0
+    size = (max(1, int(round(width * factor))), max(1, int(round(height * factor))))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA), factor
+
+
+class ProxySession:
+    """Downscaled working copy plus the full-resolution op chain applied to it"""
+
+    def __init__(self, full_image, max_side, original=None):
+        self.full_image = full_image
+        self.base, self.factor = downscale(full_image, max_side)
+        # Original at proxy size, for side-by-side display and metrics
+        self.reference = downscale(original, max_side)[0] if original is not None else None
+        self.steps = []  # (op name or None, full-resolution params, history serial)
+        self._rendered = None
+
+    def proxy_params(self, name, params):
+        """Params to use on the proxy for a full-resolution op"""
+        return get_operation(name).scale_params(params, self.factor)
+
+    def record(self, name, params, serial):
+        """Record an op applied to the proxy at a history serial (name None = not replayable)"""
+        self.steps.append((name, dict(params or {}), serial))
+
+    def rewind(self, serial):
+        """Drop steps journaled after serial (the history tip after an undo)
+
+        Matched by journal position: undo rebuilds states as new arrays, so
+        the restored image never is the array a step produced.
+        """
+        self.steps = [step for step in self.steps if step[2] <= serial]
+
+    @property
+    def replayable(self):
+        return all(name is not None for name, _, _ in self.steps)
+
+    def pipeline(self):
+        """Full-resolution pipeline for the recorded steps"""
+        if not self.replayable:
+            raise ValueError("Some edits cannot be replayed at full resolution")
+        return Pipeline([(name, params) for name, params, _ in self.steps])
+
+    def render(self):
+        """Replay the chain on the full image (cached until the chain changes)"""
+        key = tuple(serial for _, _, serial in self.steps)
+        if self._rendered is None or self._rendered[0] != key:
+            self._rendered = (key, self.pipeline().run(self.full_image, tiled=True))
+        return self._rendered[1]
+
+    def is_rendered(self):
+        key = tuple(serial for _, _, serial in self.steps)
+        return self._rendered is not None and self._rendered[0] == key
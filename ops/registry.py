@@ -0,0 +1,195 @@
+"""
+Operation Registry - headless image operations (no Streamlit)
+"""
+
+import importlib
+import numpy as np
+
+# Modules that register operations when imported
+OP_MODULES = [
+    'ops.basic',
+    'ops.enhance',
+    'ops.denoise',
+    'ops.color',
+    'ops.filters',
+    'ops.edges',
+    'ops.morphology',
+    'ops.segmentation',
+    'ops.background',
+    'ops.compression',
+    'ops.frequency',
+]
+
+OPERATIONS = {}
+
+_loaded = False
+
+
+class Param:
+    """Typed operation parameter"""
+
+    def __init__(self, name, type=float, default=None, min=None, max=None, choices=None, odd=False,
+                 spatial=False):
+        self.name = name
+        self.type = type
+        self.default = default
+        self.min = min
+        self.max = max
+        self.choices = choices
+        self.odd = odd
+        # Measured in pixels, so it shrinks with the image on proxies
+        self.spatial = spatial
+
+    def coerce(self, value):
+        """Convert and validate a parameter value"""
+        if value is None:
+            value = self.default
+        if self.type in (tuple, list):
+            value = tuple(value)
+        else:
+            value = self.type(value)
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"{self.name} must be one of {list(self.choices)}, got {value!r}")
+        if self.min is not None and value < self.min:
+            raise ValueError(f"{self.name} must be >= {self.min}, got {value}")
+        if self.max is not None and value > self.max:
+            raise ValueError(f"{self.name} must be <= {self.max}, got {value}")
+        if self.odd and int(value) % 2 == 0:
+            raise ValueError(f"{self.name} must be odd, got {value}")
+        return value
+
+    def scale(self, value, factor):
+        """Scale a spatial value by factor, keeping it valid"""
+        scaled = value * factor
+        if self.type is int:
+            scaled = int(round(scaled))
+            if self.odd and scaled % 2 == 0:
+                scaled += 1
+        if self.min is not None:
+            scaled = max(scaled, self.min)
+        return self.type(scaled)
+
+
+class Operation:
+    """Registered image operation with its dtype/channel contract"""
+
+    def __init__(self, name, func, params=(), label=None, category=None,
+                 channels=(1, 3), dtype='uint8', output_channels=None, checkpoint=False,
+                 halo=None, lut=None, color=False):
+        self.name = name
+        self.func = func
+        self.params = list(params)
+        self.label = label or name.replace('_', ' ').title()
+        self.category = category
+        self.channels = tuple(channels)
+        self.dtype = np.dtype(dtype)
+        self.output_channels = output_channels
+        # Always checkpoint the output in undo history (slow or non-deterministic ops)
+        self.checkpoint = checkpoint
+        # Neighbourhood radius as int or f(params); None means not tileable
+        self.halo = 0 if halo is None and lut is not None else halo
+        # Point ops: f(**params) -> uint8 LUT, so chains compile to one cv2.LUT
+        self.lut = lut
+        # Smooth per-pixel BGR -> BGR map that a 3D color LUT may bake (opt-in:
+        # interpolating a discontinuous op such as a threshold smears its output)
+        self.color = color
+
+    def defaults(self):
+        """Default parameter values"""
+        return {p.name: p.default for p in self.params}
+
+    def resolve_params(self, params):
+        """Fill defaults, coerce types and reject unknown parameters"""
+        known = {p.name for p in self.params}
+        unknown = set(params) - known
+        if unknown:
+            raise ValueError(f"Unknown parameters for '{self.name}': {sorted(unknown)}")
+        return {p.name: p.coerce(params.get(p.name)) for p in self.params}
+
+    @property
+    def is_point_op(self):
+        return self.lut is not None
+
+    @property
+    def is_color_op(self):
+        """Op registered with color=True, so a 3D color LUT can bake it"""
+        return self.color
+
+    def point_lut(self, params):
+        """LUT for resolved params (point ops only)"""
+        return self.lut(**params)
+
+    def scale_params(self, params, factor):
+        """Resolve params and rescale the spatial ones for an image resized by factor"""
+        params = self.resolve_params(params)
+        for p in self.params:
+            if p.spatial:
+                params[p.name] = p.scale(params[p.name], factor)
+        return params
+
+    def tile_halo(self, params):
+        """Halo radius for resolved params, or None if the op is not local"""
+        if callable(self.halo):
+            return self.halo(params)
+        return self.halo
+
+    def check_input(self, image):
+        """Validate the input array against the contract"""
+        if not isinstance(image, np.ndarray):
+            raise TypeError(f"'{self.name}' expects a numpy array, got {type(image).__name__}")
+        if image.dtype != self.dtype:
+            raise TypeError(f"'{self.name}' expects {self.dtype} input, got {image.dtype}")
+        channels = image_channels(image)
+        if channels not in self.channels:
+            raise ValueError(f"'{self.name}' expects {self.channels} channel(s), got {channels}")
+
+    def __call__(self, image, **params):
+        self.check_input(image)
+        return self.func(image, **self.resolve_params(params))
+
+    def __repr__(self):
+        return f"Operation({self.name!r})"
+
+
+def image_channels(image):
+    """Number of channels in an image array"""
+    return image.shape[2] if image.ndim == 3 else 1
+
+
+def register_op(name, params=(), **kwargs):
+    """Decorator that registers a function as an operation"""
+    def decorator(func):
+        if name in OPERATIONS:
+            raise ValueError(f"Operation '{name}' is already registered")
+        OPERATIONS[name] = Operation(name, func, params, **kwargs)
+        return func
+    return decorator
+
+
+def load_operations():
+    """Import all operation modules so they register themselves"""
+    global _loaded
+    if not _loaded:
+        for module in OP_MODULES:
+            importlib.import_module(module)
+        _loaded = True
+    return OPERATIONS
+
+
+def get_operation(name):
+    """Look up a registered operation by name"""
+    load_operations()
+    if name not in OPERATIONS:
+        raise KeyError(f"Unknown operation '{name}'")
+    return OPERATIONS[name]
+
+
+def list_operations(category=None):
+    """List registered operations, optionally filtered by category"""
+    load_operations()
+    return [op for op in OPERATIONS.values() if category is None or op.category == category]
+
+
+def apply_operation(image, name, **params):
+    """Run a single registered operation on an image"""
+    return get_operation(name)(image, **params)
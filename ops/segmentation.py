@@ -0,0 +1,35 @@
+"""
+Segmentation Operations - global, Otsu and adaptive thresholding
+"""
+
+import cv2
+from ops.registry import register_op, Param
+from ops.edges import to_gray
+
+
+@register_op('global_threshold', params=[
+    Param('threshold', int, 127, 0, 255),
+], label='Global Threshold', category='Image Segmentation', output_channels=3, halo=0)
+def global_threshold(image, threshold=127):
+    """Binary threshold at a fixed value"""
+    _, thresh = cv2.threshold(to_gray(image), threshold, 255, cv2.THRESH_BINARY)
+    return cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
+
+
+@register_op('otsu_threshold', label='Otsu Threshold', category='Image Segmentation', output_channels=3)
+def otsu_threshold(image):
+    """Binary threshold chosen by Otsu's method"""
+    _, thresh = cv2.threshold(to_gray(image), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
+
+
+@register_op('adaptive_threshold', params=[
+    Param('block_size', int, 11, 3, 51, odd=True, spatial=True),
+    Param('C', int, 2, -10, 10),
+], label='Adaptive Threshold', category='Image Segmentation', output_channels=3,
+    halo=lambda p: p['block_size'] // 2)
+def adaptive_threshold(image, block_size=11, C=2):
+    """Gaussian adaptive threshold"""
+    thresh = cv2.adaptiveThreshold(to_gray(image), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                   cv2.THRESH_BINARY, block_size, C)
+    return cv2.cvtColor(thresh, cv2.COLOR_GRAY2BGR)
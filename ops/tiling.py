@@ -0,0 +1,127 @@
+"""
+Tiled Execution - run local operations over halo-padded tiles in parallel
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
+from config import TILE_SIZE, TILE_WORKERS
+from ops.registry import get_operation
+
+
+def gaussian_radius(sigma):
+    """Kernel radius OpenCV derives from sigma for 8-bit images"""
+    ksize = int(round(sigma * 3 * 2 + 1)) | 1
+    return ksize // 2
+
+
+class Cancelled(Exception):
+    """Raised when a tiled run is stopped through its CancelToken"""
+
+
+class CancelToken:
+    """Thread-safe flag checked between tiles"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled("Processing was cancelled")
+
+
+def tile_bounds(length, tile_size):
+    """(start, stop) ranges covering length"""
+    return [(start, min(start + tile_size, length)) for start in range(0, length, tile_size)]
+
+
+def run_tiled(image, func, halo, tile_size=None, workers=None, progress=None, cancel=None):
+    """Apply func to halo-padded tiles and stitch the results
+
+    func must be local (each output pixel depends only on inputs within
+    halo pixels) and keep the spatial size; the result is then identical
+    to func(image). Only a few tiles of temporaries exist at once.
+    """
+    tile_size = tile_size or TILE_SIZE
+    height, width = image.shape[:2]
+    if height <= tile_size and width <= tile_size and progress is None:
+        return func(image)
+    return render_tiled((height, width), lambda y0, y1, x0, x1: func(image[y0:y1, x0:x1]),
+                        halo, tile_size, workers, progress=progress, cancel=cancel)
+
+
+def render_tiled(size, render, halo=0, tile_size=None, workers=None, output=None, progress=None, cancel=None):
+    """Assemble a (height, width) output from render(y0, y1, x0, x1) calls in parallel
+
+    render produces the output region for the given bounds, which are the
+    tile grown by halo (clamped to the output) so neighbourhood filters see
+    real neighbours; the halo is cropped off before stitching.
+    
+    progress(done, total, eta_seconds) is called from the calling thread as
+    tiles finish (eta is None until the first tile is done). A CancelToken
+    stops the run between tiles and raises Cancelled; any exception raised
+    by progress (e.g. Streamlit stopping the script) also drops the tiles
+    that have not started yet.
+    """
+    tile_size = tile_size or TILE_SIZE
+    height, width = size
+    tiles = [(y0, y1, x0, x1)
+             for y0, y1 in tile_bounds(height, tile_size)
+             for x0, x1 in tile_bounds(width, tile_size)]
+    
+    def process(bounds):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        y0, y1, x0, x1 = bounds
+        hy0, hy1 = max(0, y0 - halo), min(height, y1 + halo)
+        hx0, hx1 = max(0, x0 - halo), min(width, x1 + halo)
+        result = render(hy0, hy1, hx0, hx1)
+        return bounds, result[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+    
+    start = time.perf_counter()
+    if progress is not None:
+        progress(0, len(tiles), None)
+    with ThreadPoolExecutor(max_workers=workers or TILE_WORKERS) as pool:
+        pending = {pool.submit(process, bounds) for bounds in tiles}
+        done = 0
+        try:
+            while pending:
+                finished, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                for future in finished:
+                    (y0, y1, x0, x1), tile = future.result()
+                    if output is None:
+                        output = np.empty((height, width) + tile.shape[2:], tile.dtype)
+                    output[y0:y1, x0:x1] = tile
+                    done += 1
+                if finished and progress is not None:
+                    elapsed = time.perf_counter() - start
+                    progress(done, len(tiles), elapsed / done * (len(tiles) - done))
+        except BaseException:
+            # Tiles already running finish; the rest never start
+            if cancel is not None:
+                cancel.cancel()
+            for future in pending:
+                future.cancel()
+            raise
+    return output
+
+
+def apply_tiled(image, name, tile_size=None, workers=None, progress=None, cancel=None, **params):
+    """Run a registered operation tile by tile when it is local (see render_tiled for progress/cancel)"""
+    op = get_operation(name)
+    op.check_input(image)
+    params = op.resolve_params(params)
+    halo = op.tile_halo(params)
+    if halo is None:
+        return op.func(image, **params)
+    return run_tiled(image, lambda tile: op.func(tile, **params), halo, tile_size, workers, progress, cancel)
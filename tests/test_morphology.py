@@ -0,0 +1,53 @@
+"""
+Morphology tests - the separable engine matches OpenCV and is reached from the UI
+"""
+
+import cv2
+import numpy as np
+import pytest
+from ops.morphology import ELEMENT_SHAPES, MORPH_OPERATIONS, decomposition, morphology, structuring_element
+
+# Largest settings offered by modules/morphology.py
+UI_KERNEL_SIZE = 31
+UI_ITERATIONS = 10
+
+
+def reference(image, operation, kernel, iterations):
+    """The same operation through OpenCV only"""
+    if operation == 'Erosion':
+        return cv2.erode(image, kernel, iterations=iterations)
+    if operation == 'Dilation':
+        return cv2.dilate(image, kernel, iterations=iterations)
+    if operation == 'Gradient':
+        return cv2.morphologyEx(image, cv2.MORPH_GRADIENT, kernel)
+    flag = cv2.MORPH_OPEN if operation == 'Opening' else cv2.MORPH_CLOSE
+    return cv2.morphologyEx(image, flag, kernel, iterations=iterations)
+
+
+@pytest.fixture(scope='module', params=['color', 'binary'])
+def image(request):
+    rng = np.random.default_rng(0)
+    if request.param == 'binary':
+        return (rng.random((181, 243)) > 0.4).astype(np.uint8) * 255
+    return cv2.GaussianBlur(rng.integers(0, 256, (181, 243, 3), dtype=np.uint8), (0, 0), 2)
+
+
+def test_ui_maximum_uses_decomposition():
+    kernel = structuring_element('Ellipse', UI_KERNEL_SIZE)
+    assert decomposition(kernel, UI_ITERATIONS) is not None
+
+
+@pytest.mark.parametrize('operation', MORPH_OPERATIONS)
+@pytest.mark.parametrize('shape', list(ELEMENT_SHAPES))
+def test_ui_maximum_matches_opencv(image, operation, shape):
+    kernel = structuring_element(shape, UI_KERNEL_SIZE)
+    result = morphology(image, operation, UI_KERNEL_SIZE, UI_ITERATIONS, shape)
+    np.testing.assert_array_equal(result, reference(image, operation, kernel, UI_ITERATIONS))
+
+
+@pytest.mark.parametrize('size, iterations', [(15, 5), (31, 1), (31, 3)])
+def test_ellipse_matches_opencv(image, size, iterations):
+    kernel = structuring_element('Ellipse', size)
+    for operation in ('Erosion', 'Dilation'):
+        result = morphology(image, operation, size, iterations, 'Ellipse')
+        np.testing.assert_array_equal(result, reference(image, operation, kernel, iterations))
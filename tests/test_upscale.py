@@ -0,0 +1,32 @@
+"""
+Upscale tests - tiled upscaling reproduces a whole-image cv2.resize
+"""
+
+import cv2
+import numpy as np
+import pytest
+from ops.enhance import INTERPOLATION_MAP, SHARPEN_KERNEL, upscale_image
+
+
+def reference(image, scale_factor, method, sharpen):
+    """Untiled upscale: cv2.resize of the whole image, then the sharpening kernel"""
+    height, width = image.shape[:2]
+    result = cv2.resize(image, (int(width * scale_factor), int(height * scale_factor)),
+                        interpolation=INTERPOLATION_MAP[method])
+    return cv2.filter2D(result, -1, SHARPEN_KERNEL) if sharpen else result
+
+
+@pytest.fixture(scope='module')
+def image():
+    # Odd sizes, larger than one tile once upscaled
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (715, 1033, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 1.5)
+
+
+@pytest.mark.parametrize('method', list(INTERPOLATION_MAP))
+@pytest.mark.parametrize('scale_factor', [1.5, 1.3, 2.0])
+@pytest.mark.parametrize('sharpen', [False, True])
+def test_upscale_matches_resize(image, scale_factor, method, sharpen):
+    result = upscale_image(image, scale_factor, method, sharpen)
+    np.testing.assert_array_equal(result, reference(image, scale_factor, method, sharpen))
@@ -2,55 +2,47 @@
 Image Utilities - FIXED (no deprecation warnings)
 """
 
-import cv2
-import numpy as np
-from PIL import Image
 import streamlit as st
-from io import BytesIO
+from ops.cache import LRUCache
+from ops.decode import content_hash, decode_cached, decode_preview
+from ops.encode import encoded_stream
+from ops.preview import preview_bytes
+
+# Streamlit upload id -> content hash, so reruns don't rehash the buffer
+_upload_hashes = LRUCache(64)
+
+def upload_key(uploaded_file):
+    """Content hash of an uploaded file (identical bytes share a key)"""
+    upload_id = getattr(uploaded_file, 'file_id', None) or id(uploaded_file)
+    return _upload_hashes.get_or_compute(upload_id, lambda: content_hash(uploaded_file.getvalue()))
 
 def load_image(uploaded_file):
-    """Load image from uploaded file"""
+    """Load image from uploaded file (decoded once per distinct content)"""
     try:
-        image = Image.open(uploaded_file)
-        image_np = np.array(image)
-        
-        if len(image_np.shape) == 3 and image_np.shape[2] == 3:
-            image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
-        
-        return image_np
+        return decode_cached(uploaded_file.getvalue(), key=upload_key(uploaded_file))
     except Exception as e:
         st.error(f"Error loading image: {str(e)}")
         return None
 
-def save_image(image, format='PNG'):
-    """Convert image to downloadable bytes"""
+def load_preview(uploaded_file, max_side):
+    """Reduced-resolution decode of an uploaded file for thumbnails"""
+    try:
+        return decode_preview(uploaded_file.getvalue(), max_side, key=upload_key(uploaded_file))
+    except Exception:
+        return None
+
+def save_image(image, format='PNG', **settings):
+    """Encoded image as a file object for download (encoded once per version and settings)"""
     try:
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        else:
-            image_rgb = image
-        
-        pil_image = Image.fromarray(image_rgb.astype('uint8'))
-        
-        buf = BytesIO()
-        pil_image.save(buf, format=format)
-        byte_im = buf.getvalue()
-        
-        return byte_im
+        return encoded_stream(image, format, **settings)
     except Exception as e:
         st.error(f"Error saving image: {str(e)}")
         return None
 
 def display_image(image, caption="", use_container_width=True):
-    """Display image in Streamlit (FIXED - no deprecation warning)"""
+    """Display a display-sized, pre-encoded preview (cached per image version)"""
     try:
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        else:
-            image_rgb = image
-        
-        # Changed from use_column_width to use_container_width
-        st.image(image_rgb, caption=caption, use_container_width=use_container_width)
+        st.image(preview_bytes(image), caption=caption, use_container_width=use_container_width)
     except Exception as e:
         st.error(f"Error displaying image: {str(e)}")
 
@@ -1,68 +1,134 @@
 """
-Quality Metrics - FIXED (handles identical images)
+Quality Metrics - fused single pass, cached per image version
 """
 
 import cv2
 import numpy as np
-from skimage.metrics import structural_similarity as ssim
-from skimage.metrics import peak_signal_noise_ratio as psnr
-from skimage.metrics import mean_squared_error as mse
+from ops.cache import LRUCache, image_version
+from ops.planes import convert, plane
+
+# SSIM constants (same defaults as skimage.metrics.structural_similarity)
+SSIM_WIN_SIZE = 7
+SSIM_K1 = 0.01
+SSIM_K2 = 0.03
+
+_metrics_cache = LRUCache(32)
+
+def data_range(image):
+    """Value range implied by the image dtype"""
+    if np.issubdtype(image.dtype, np.integer):
+        return float(np.iinfo(image.dtype).max)
+    return 1.0
+
+def gray_plane(image, cached=True):
+    """Grayscale plane, shared with the ops through the derived-plane cache unless cached=False"""
+    return plane(image, 'gray') if cached else convert(image, 'gray')
+
+def _ssim(x, y, value_range):
+    """Mean SSIM of two grayscale planes (uniform 7x7 window)"""
+    if min(x.shape) < SSIM_WIN_SIZE:
+        return None
+
+    x = x.astype(np.float32)
+    y = y.astype(np.float32)
+
+    ksize = (SSIM_WIN_SIZE, SSIM_WIN_SIZE)
+    n = SSIM_WIN_SIZE ** 2
+    cov_norm = n / (n - 1)
+    c1 = (SSIM_K1 * value_range) ** 2
+    c2 = (SSIM_K2 * value_range) ** 2
+    border = cv2.BORDER_REFLECT
+
+    depth = cv2.CV_32F
+    ux = cv2.boxFilter(x, depth, ksize, borderType=border)
+    uy = cv2.boxFilter(y, depth, ksize, borderType=border)
+    vx = cv2.sqrBoxFilter(x, depth, ksize, borderType=border)
+    vy = cv2.sqrBoxFilter(y, depth, ksize, borderType=border)
+    vxy = cv2.boxFilter(x * y, depth, ksize, borderType=border)
+
+    uxuy = ux * uy
+    ux *= ux
+    uy *= uy
+
+    # Variances/covariance with sample normalization, computed in place
+    vx -= ux
+    vx *= cov_norm
+    vy -= uy
+    vy *= cov_norm
+    vxy -= uxuy
+    vxy *= cov_norm
+
+    # SSIM = (2*ux*uy + c1)(2*vxy + c2) / ((ux^2 + uy^2 + c1)(vx + vy + c2))
+    uxuy *= 2
+    uxuy += c1
+    vxy *= 2
+    vxy += c2
+    uxuy *= vxy
+    ux += uy
+    ux += c1
+    vx += vy
+    vx += c2
+    ux *= vx
+    uxuy /= ux
+    ssim_map = uxuy
+
+    pad = (SSIM_WIN_SIZE - 1) // 2
+    return float(ssim_map[pad:-pad, pad:-pad].mean(dtype=np.float64))
+
+def _compute_metrics(original, processed, cache_processed=True):
+    """Compute MSE, PSNR and SSIM in one pass over shared buffers"""
+    if original.shape != processed.shape or original.dtype != processed.dtype:
+        return {'PSNR': None, 'SSIM': None, 'MSE': None}
+
+    # MSE on all channels; zero means the images are identical
+    mse_val = cv2.norm(original, processed, cv2.NORM_L2SQR) / original.size
+    if mse_val == 0:
+        return {'PSNR': float('inf'), 'SSIM': 1.0, 'MSE': 0.0}
+
+    value_range = data_range(original)
+    gray_o = gray_plane(original)
+    gray_p = gray_plane(processed, cache_processed)
+
+    mse_gray = cv2.norm(gray_o, gray_p, cv2.NORM_L2SQR) / gray_o.size
+    psnr_val = float('inf') if mse_gray == 0 else 10 * np.log10(value_range ** 2 / mse_gray)
+
+    return {
+        'PSNR': float(psnr_val),
+        'SSIM': _ssim(gray_o, gray_p, value_range),
+        'MSE': float(mse_val)
+    }
 
 def calculate_psnr(original, processed):
     """Calculate PSNR"""
-    try:
-        # Check if images are identical
-        if np.array_equal(original, processed):
-            return float('inf')  # Perfect quality
-        
-        if len(original.shape) == 3:
-            original_gray = cv2.cvtColor(original, cv2.COLOR_BGR2GRAY)
-            processed_gray = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
-        else:
-            original_gray = original
-            processed_gray = processed
-        
-        return psnr(original_gray, processed_gray)
-    except:
-        return None
+    return calculate_all_metrics(original, processed)['PSNR']
 
 def calculate_ssim(original, processed):
     """Calculate SSIM"""
-    try:
-        # Check if images are identical
-        if np.array_equal(original, processed):
-            return 1.0  # Perfect similarity
-        
-        if len(original.shape) == 3:
-            original_gray = cv2.cvtColor(original, cv2.COLOR_BGR2GRAY)
-            processed_gray = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
-        else:
-            original_gray = original
-            processed_gray = processed
-        
-        return ssim(original_gray, processed_gray)
-    except:
-        return None
+    return calculate_all_metrics(original, processed)['SSIM']
 
 def calculate_mse(original, processed):
     """Calculate MSE"""
+    return calculate_all_metrics(original, processed)['MSE']
+
+def _safe_metrics(original, processed, cache_processed=True):
     try:
-        # Check if images are identical
-        if np.array_equal(original, processed):
-            return 0.0  # No error
-        
-        return mse(original, processed)
-    except:
-        return None
+        return _compute_metrics(original, processed, cache_processed)
+    except Exception:
+        return {'PSNR': None, 'SSIM': None, 'MSE': None}
 
 def calculate_all_metrics(original, processed):
-    """Calculate all metrics"""
-    metrics = {
-        'PSNR': calculate_psnr(original, processed),
-        'SSIM': calculate_ssim(original, processed),
-        'MSE': calculate_mse(original, processed)
-    }
-    return metrics
+    """Calculate all metrics (memoized by original/processed version)"""
+    key = (image_version(original), image_version(processed))
+    return dict(_metrics_cache.get_or_compute(key, lambda: _safe_metrics(original, processed)))
+
+def calculate_metrics_uncached(original, processed):
+    """Calculate all metrics for a throwaway processed image (e.g. a temporary decode)
+
+    Neither the result nor the processed image's gray plane is cached, so
+    scoring many candidates doesn't evict session entries; the original's
+    plane is still shared.
+    """
+    return _safe_metrics(original, processed, cache_processed=False)
 
 def get_quality_label(metric_name, value):
     """Get quality label"""
@@ -0,0 +1,116 @@
+"""
+Session Helpers - apply registered operations to the session image
+"""
+
+import cv2
+import streamlit as st
+from config import HISTORY_BUDGET_MB, HISTORY_CHECKPOINT_INTERVAL, PROXY_MAX_SIDE
+from ops.history import History
+from ops.proxy import ProxySession
+from ops.tiling import apply_tiled
+
+
+def new_history():
+    """Empty undo history with the configured budget"""
+    return History(HISTORY_BUDGET_MB * 1024 * 1024, HISTORY_CHECKPOINT_INTERVAL)
+
+
+def get_proxy():
+    """Active proxy session, or None when editing at full resolution"""
+    return st.session_state.get('proxy')
+
+
+def full_resolution_shape():
+    """Shape of the image being edited at full resolution (even while on a proxy)"""
+    proxy = get_proxy()
+    image = proxy.full_image if proxy is not None else st.session_state.processed_image
+    return image.shape
+
+
+def commit_result(result, name=None, params=None, applied_params=None):
+    """Replace processed_image with a result and journal the step for undo
+
+    params are the user-facing (full-resolution) values; applied_params are
+    the values actually used on processed_image when they differ (proxy).
+    """
+    applied_params = params if applied_params is None else applied_params
+    serial = st.session_state.history.record(st.session_state.processed_image, name, applied_params, result)
+    proxy = get_proxy()
+    if proxy is not None:
+        proxy.record(name, params, serial)
+    st.session_state.processed_image = result
+    return result
+
+
+def run_operation(name, progress=None, cancel=None, tile_size=None, **params):
+    """Apply a registered operation to processed_image (tiled when local)
+
+    progress/cancel are passed to the tiled run (see ops.tiling.render_tiled).
+    """
+    proxy = get_proxy()
+    applied_params = proxy.proxy_params(name, params) if proxy is not None else params
+    result = apply_tiled(st.session_state.processed_image, name, tile_size=tile_size, progress=progress,
+                         cancel=cancel, **applied_params)
+    return commit_result(result, name, params, applied_params)
+
+
+def undo():
+    """Step back in history; returns False if there was nothing to undo"""
+    previous = st.session_state.history.undo(st.session_state.processed_image)
+    if previous is None:
+        return False
+    proxy = get_proxy()
+    if proxy is not None:
+        proxy.rewind(st.session_state.history.tip_serial)
+    st.session_state.processed_image = previous
+    return True
+
+
+def reset_image():
+    """Go back to the original image (keeps proxy mode)"""
+    if get_proxy() is not None:
+        start_proxy(st.session_state.original_image)
+    else:
+        st.session_state.processed_image = st.session_state.original_image.copy()
+
+
+def start_proxy(full_image):
+    """Switch to editing a display-sized proxy of full_image"""
+    proxy = ProxySession(full_image, PROXY_MAX_SIDE, st.session_state.original_image)
+    st.session_state.proxy = proxy
+    st.session_state.processed_image = proxy.base
+    st.session_state.history = new_history()
+
+
+def stop_proxy(unreplayable=None):
+    """Render the proxy chain at full resolution and leave proxy mode
+
+    When the chain holds edits that can't be replayed (background swaps),
+    unreplayable picks the outcome: 'discard' drops the proxy edits, 'keep'
+    keeps the proxy-resolution result (scaled to full size). Without it
+    such a chain stays in proxy mode and False is returned.
+    """
+    proxy = get_proxy()
+    if proxy is None:
+        return True
+    if proxy.replayable:
+        result = proxy.render()
+    elif unreplayable == 'discard':
+        result = proxy.full_image
+    elif unreplayable == 'keep':
+        height, width = proxy.full_image.shape[:2]
+        result = cv2.resize(st.session_state.processed_image, (width, height), interpolation=cv2.INTER_LINEAR)
+    else:
+        return False
+    st.session_state.processed_image = result
+    st.session_state.proxy = None
+    st.session_state.history = new_history()
+    return True
+
+
+def display_original():
+    """Original image matching the resolution of processed_image"""
+    proxy = get_proxy()
+    if proxy is not None and proxy.reference is not None:
+        return proxy.reference
+    return st.session_state.original_image
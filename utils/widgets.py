@@ -0,0 +1,75 @@
+"""
+Operation Widgets - Streamlit inputs generated from operation params
+"""
+
+import streamlit as st
+from ops.blur import relative_sigma
+from ops.live_preview import LivePreview
+from ops.smoothing import SMOOTHING_ENGINES
+from utils.image_utils import display_image
+from utils.session import full_resolution_shape, get_proxy
+
+
+def param_widget(param, key):
+    """Render an input widget for one operation parameter"""
+    label = param.name.replace('_', ' ').title()
+    
+    if param.choices is not None:
+        choices = list(param.choices)
+        return st.selectbox(label, choices, index=choices.index(param.default), key=key)
+    
+    if param.type is bool:
+        return st.checkbox(label, value=param.default, key=key)
+    
+    if param.type in (int, float) and param.min is not None and param.max is not None:
+        if param.type is int:
+            step = 2 if param.odd else 1
+        else:
+            step = None
+        return st.slider(label, param.type(param.min), param.type(param.max),
+                         param.type(param.default), step, key=key)
+    
+    return param.default
+
+
+def operation_params(op, key_prefix):
+    """Render widgets for all parameters of an operation"""
+    return {p.name: param_widget(p, f"{key_prefix}_{p.name}") for p in op.params}
+
+
+def smoothing_engine(key):
+    """Select the edge-preserving smoothing engine (exact bilateral or a fast approximation)"""
+    return st.selectbox("Smoothing Engine", list(SMOOTHING_ENGINES), format_func=SMOOTHING_ENGINES.get, key=key,
+                        help="Guided filter and bilateral grid cost the same at any diameter "
+                             "(the grid falls back to exact below diameter 11, where it gains little)")
+
+
+def relative_blur(label, default_percent, key, max_percent=5.0):
+    """Blur slider in percent of the image's short side; returns the full-resolution sigma
+
+    The proxy rescales sigma, so previews and full renders blur the same
+    fraction of the picture.
+    """
+    percent = st.slider(label, 0.05, max_percent, default_percent, 0.05, format="%.2f%%", key=key)
+    return relative_sigma(full_resolution_shape(), percent)
+
+
+def live_preview(name, key, **params):
+    """Optional live preview of an op on a thumbnail; never touches processed_image or history"""
+    if not st.checkbox("👁️ Live Preview", value=False, key=f"{key}_live"):
+        return
+    renderer = st.session_state.get('live_preview')
+    if renderer is None:
+        renderer = st.session_state.live_preview = LivePreview()
+    proxy = get_proxy()
+    factor = proxy.factor if proxy is not None else 1.0
+    try:
+        preview, seconds, current = renderer.render(st.session_state.processed_image, name, params, factor)
+    except Exception as e:
+        st.warning(f"Preview unavailable: {str(e)}")
+        return
+    if preview is None:
+        st.caption("Rendering preview...")
+        return
+    status = f"{seconds * 1000:.0f} ms" if current else "updating..."
+    display_image(preview, caption=f"Preview {preview.shape[1]}×{preview.shape[0]} · {status} · not applied")